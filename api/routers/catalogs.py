@@ -3,11 +3,12 @@ from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, UploadFi
 from sqlalchemy.orm import Session
 from typing import List
 import os
+import shutil
 
 from api.database import get_db
 from api.models import orm
 from api import schemas
-from scripts.import_catalog import import_catalog
+from scripts.import_catalog import import_catalog, read_catalog_stream, catalog_name_for, find_existing_catalog
 
 router = APIRouter(
     prefix="/api/catalogs",
@@ -32,11 +33,15 @@ def read_catalog(catalog_id: int, db: Session = Depends(get_db)):
 def import_catalog_endpoint(
     file: UploadFile = File(...), 
     enrich: bool = Form(False),
+    force: bool = Form(False),
     background_tasks: BackgroundTasks = BackgroundTasks(),
     db: Session = Depends(get_db)
 ):
     """
     Import a catalog from an uploaded JSON file.
+    
+    A catalog already imported under the same name (from the file name) and
+    source folder is skipped unless force is set, in which case it is replaced.
     """
     # Ensure upload directory exists
     upload_dir = "data/uploads"
@@ -45,19 +50,40 @@ def import_catalog_endpoint(
     file_path = os.path.join(upload_dir, file.filename)
     
     with open(file_path, "wb") as buffer:
-        import shutil
         shutil.copyfileobj(file.file, buffer)
         
-    background_tasks.add_task(import_catalog_task, file_path, enrich=enrich)
+    # Decide skip / replace up front so the response can say which happened
+    try:
+        metadata, _, _ = read_catalog_stream(file_path)
+        existing_id = find_existing_catalog(db, catalog_name_for(file_path), metadata.get("source_folder"))
+    except Exception:
+        existing_id = None  # unreadable file: the background import reports the error
+
+    if existing_id is not None and not force:
+        return {
+            "message": "Catalog already imported; skipped (upload again with force=true to replace it)",
+            "file": file.filename,
+            "status": "skipped",
+            "catalog_id": existing_id
+        }
+
+    background_tasks.add_task(import_catalog_task, file_path, enrich=enrich, force=force)
     
-    return {"message": "Import started in background", "file": file.filename}
+    if existing_id is not None:
+        return {
+            "message": f"Import started in background, replacing catalog {existing_id}",
+            "file": file.filename,
+            "status": "replacing",
+            "catalog_id": existing_id
+        }
+    return {"message": "Import started in background", "file": file.filename, "status": "started"}
 
-def import_catalog_task(file_path: str, enrich: bool = False):
+def import_catalog_task(file_path: str, enrich: bool = False, force: bool = False):
     # Create a fresh session for the background thread
     from api.database import SessionLocal
     db = SessionLocal()
     try:
-        import_catalog(file_path, db, verbose=True, enrich=enrich)
+        import_catalog(file_path, db, verbose=True, enrich=enrich, force=force)
     finally:
         db.close()
 
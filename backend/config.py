@@ -40,6 +40,8 @@ DEFAULT_MODEL = os.environ.get("DEFAULT_MODEL", "claude-haiku-4-5-20251001")
 
 # Paths
 DEFAULT_STATE_FILE = os.path.expanduser("~/.meal_plan_state.json")
+# shelve file of LLM answers from `import_catalog.py --enrich`, keyed by prompt hash
+ENRICH_CACHE_FILE = os.environ.get("ENRICH_CACHE_FILE", os.path.expanduser("~/.meal_planner_enrich_cache"))
 
 # Image Extensions
 IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.webp', '.gif'}
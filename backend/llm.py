@@ -1,6 +1,5 @@
 
 import json
-import requests
 import os
 from typing import Optional, List, Dict, Any, Union
 from . import config
@@ -15,6 +14,8 @@ def is_claude_model(model: str) -> bool:
 def query_ollama(prompt: str, model: str = config.DEFAULT_OLLAMA_MODEL, 
                  images: List[str] = None, json_mode: bool = False) -> Optional[str]:
     """Send a prompt (text or vision) to Ollama."""
+    import requests  # deferred: costs ~100ms and catalog-only commands never query a model
+    
     payload = {
         "model": model,
         "prompt": prompt,
@@ -50,6 +51,8 @@ def query_claude(prompt: str, model: str, api_key: str = None,
     Send a prompt to Claude API.
     images kwarg expects list of dicts: {'media_type': 'image/jpeg', 'data': 'base64str'}
     """
+    import requests
+    
     key = api_key or config.ANTHROPIC_API_KEY
     if not key:
         print("Error: Claude API key required.")
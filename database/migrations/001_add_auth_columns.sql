@@ -1,6 +1,8 @@
 -- Add missing columns for Authentication and RBAC
-ALTER TABLE users ADD COLUMN role VARCHAR(50) DEFAULT 'user';
-ALTER TABLE users ADD COLUMN google_id VARCHAR(255) UNIQUE DEFAULT NULL;
-ALTER TABLE users ADD COLUMN avatar_url VARCHAR(500) DEFAULT NULL;
-ALTER TABLE users ADD COLUMN preferences JSON;
-ALTER TABLE users MODIFY COLUMN password_hash VARCHAR(255) NULL;
+-- One statement, safe to re-run: IF NOT EXISTS skips columns that are already there (MariaDB 10.0.2+)
+ALTER TABLE users
+    ADD COLUMN IF NOT EXISTS role VARCHAR(50) DEFAULT 'user',
+    ADD COLUMN IF NOT EXISTS google_id VARCHAR(255) UNIQUE DEFAULT NULL,
+    ADD COLUMN IF NOT EXISTS avatar_url VARCHAR(500) DEFAULT NULL,
+    ADD COLUMN IF NOT EXISTS preferences JSON,
+    MODIFY COLUMN password_hash VARCHAR(255) NULL;
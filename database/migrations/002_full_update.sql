@@ -1,13 +1,15 @@
 -- 1. Update Users Table (Auth & RBAC)
--- If these fail because columns exist, you can ignore the specific error and move to the next line.
-ALTER TABLE users ADD COLUMN role VARCHAR(50) DEFAULT 'user';
-ALTER TABLE users ADD COLUMN google_id VARCHAR(255) UNIQUE DEFAULT NULL;
-ALTER TABLE users ADD COLUMN avatar_url VARCHAR(500) DEFAULT NULL;
-ALTER TABLE users ADD COLUMN preferences JSON;
-ALTER TABLE users MODIFY COLUMN password_hash VARCHAR(255) NULL;
+-- Safe to re-run: IF NOT EXISTS skips columns that are already there (MariaDB 10.0.2+),
+-- and each table is altered in a single statement.
+ALTER TABLE users
+    ADD COLUMN IF NOT EXISTS role VARCHAR(50) DEFAULT 'user',
+    ADD COLUMN IF NOT EXISTS google_id VARCHAR(255) UNIQUE DEFAULT NULL,
+    ADD COLUMN IF NOT EXISTS avatar_url VARCHAR(500) DEFAULT NULL,
+    ADD COLUMN IF NOT EXISTS preferences JSON,
+    MODIFY COLUMN password_hash VARCHAR(255) NULL;
 
 -- 2. Update Meal Plans Table (Community Features)
-ALTER TABLE meal_plans ADD COLUMN is_public BOOLEAN DEFAULT FALSE;
+ALTER TABLE meal_plans ADD COLUMN IF NOT EXISTS is_public BOOLEAN DEFAULT FALSE;
 
 -- 3. Create Plan Likes Table (Community Features)
 CREATE TABLE IF NOT EXISTS plan_likes (
@@ -14,15 +14,41 @@ import os
 import sys
 import base64
 import argparse
+import functools
 import re
 import tempfile
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-import requests
 from typing import Optional, List, Dict, Any
 
 from backend import config, llm, image as img_utils
 
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# CLI choices (macro filters match the by_macros keys built by build_recipe_index)
+MACRO_CHOICES = ("high_protein", "low_carb", "low_calorie")
+SORT_CHOICES = ("name", "date")
+
+# Concurrent page classifications for Claude (each is an independent, I/O-bound
+# API call). Ollama serves vision requests one at a time, so extra concurrent
+# requests would only queue up there and hit query_ollama's timeout.
+MAX_CLASSIFY_WORKERS = 8
+
+# Recipe fields needed by the simple -l listing (and the chapter auto-fix that precedes it)
+LIST_FIELDS = ("name", "chapter", "chapter_number", "sub_recipes")
+
 
 def preprocess_image_for_text(image_path: str) -> Optional[str]:
     """Delegate to backend."""
@@ -317,6 +343,30 @@ Respond with ONLY the JSON, no other text."""
     return result
 
 
+def classify_pages(image_paths: List[str], model: str, api_key: str = None,
+                   backup_model: str = None) -> List[dict]:
+    """
+    Classify several pages concurrently, returning results in input order.
+    
+    Classification only looks at the page itself, so unlike extraction (which
+    carries pending recipes and chapter context from page to page) it can run
+    ahead of the sequential processing loop. Only Claude models are queried
+    concurrently; local Ollama models get one request at a time. That includes
+    an Ollama backup model, which takes over any page too large for Claude.
+    """
+    if not image_paths:
+        return []
+
+    print(f"Classifying {len(image_paths)} page(s)...")
+    ollama_backup = backup_model and not llm.is_claude_model(backup_model)
+    if not llm.is_claude_model(model) or ollama_backup:
+        return [classify_page(path, model, api_key, backup_model) for path in image_paths]
+    with ThreadPoolExecutor(max_workers=min(MAX_CLASSIFY_WORKERS, len(image_paths))) as executor:
+        return list(executor.map(
+            lambda path: classify_page(path, model, api_key, backup_model), image_paths
+        ))
+
+
 def extract_chapter_info(image_path: str, model: str, api_key: str = None, backup_model: str = None) -> dict:
     """Extract chapter information and recipe list from a chapter/TOC page."""
     
@@ -1046,6 +1096,7 @@ def upsert_recipes(catalog: dict, new_recipes: list, new_chapters: list = None,
             })
     
     # Process new chapters (if any)
+    chapters_changed = 0
     if new_chapters:
         existing_chapters = {}
         for i, chapter in enumerate(catalog["chapters"]):
@@ -1065,14 +1116,16 @@ def upsert_recipes(catalog: dict, new_recipes: list, new_chapters: list = None,
             else:
                 # Add new chapter
                 catalog["chapters"].append(chapter)
+            chapters_changed += 1
     
     # Reassign unknown chapters based on chapter recipe lists
     reassigned = reassign_unknown_chapters(catalog)
     if reassigned > 0:
         print(f"  📁 Reassigned {reassigned} recipe(s) to correct chapters")
     
-    # Rebuild index
-    catalog["index"] = build_recipe_index(catalog)
+    # Rebuild index (skipped when nothing changed and the full index is already present)
+    if added or updated or merged or chapters_changed or reassigned or "by_name" not in catalog.get("index", {}):
+        catalog["index"] = build_recipe_index(catalog)
     
     # Update metadata
     catalog["metadata"]["recipes_extracted"] = len(catalog["recipes"])
@@ -1218,24 +1271,29 @@ def get_random_recipe(catalog: dict, chapter: str = None, dietary: str = None,
     index = catalog.get("index", {})
     recipes = catalog.get("recipes", [])
     
-    # Start with all recipes
-    recipe_names = set(index.get("all_recipes", []))
+    # --delete leaves only a name -> position map; regenerate the full index on a miss
+    if "by_name" not in index:
+        index = build_recipe_index(catalog)
     
-    # Filter by chapter
+    # Each filter is a precomputed reverse-index list; start from the most
+    # selective one and check the rest by set membership
+    candidate_lists = []
     if chapter:
-        chapter_recipes = set(index.get("by_chapter", {}).get(chapter, []))
-        recipe_names = recipe_names.intersection(chapter_recipes)
-    
-    # Filter by dietary
+        candidate_lists.append(index.get("by_chapter", {}).get(chapter, []))
     if dietary:
         dietary_key = dietary.lower().replace("-", "_").replace(" ", "_")
-        dietary_recipes = set(index.get("by_dietary", {}).get(dietary_key, []))
-        recipe_names = recipe_names.intersection(dietary_recipes)
-    
-    # Filter by macros
+        candidate_lists.append(index.get("by_dietary", {}).get(dietary_key, []))
     if macro_filter:
-        macro_recipes = set(index.get("by_macros", {}).get(macro_filter, []))
-        recipe_names = recipe_names.intersection(macro_recipes)
+        candidate_lists.append(index.get("by_macros", {}).get(macro_filter, []))
+    
+    if candidate_lists:
+        candidate_lists.sort(key=len)
+        other_sets = [set(names) for names in candidate_lists[1:]]
+        recipe_names = [name for name in candidate_lists[0]
+                        if all(name in names for names in other_sets)]
+    else:
+        # No filters - pick straight from the full name list
+        recipe_names = index.get("all_recipes", [])
     
     if not recipe_names:
         filters = []
@@ -1247,7 +1305,7 @@ def get_random_recipe(catalog: dict, chapter: str = None, dietary: str = None,
             filters.append(f"macro='{macro_filter}'")
         return {"error": f"No recipes found matching filters: {', '.join(filters)}"}
     
-    chosen_name = random.choice(list(recipe_names))
+    chosen_name = random.choice(recipe_names)
     recipe_info = index.get("by_name", {}).get(chosen_name, {})
     recipe_idx = recipe_info.get("recipe_index")
     
@@ -1257,6 +1315,72 @@ def get_random_recipe(catalog: dict, chapter: str = None, dietary: str = None,
     return {"error": f"Could not find recipe: {chosen_name}"}
 
 
+def load_catalog_json(path: str) -> dict:
+    """Read a catalog (or result) JSON file, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_catalog_json(data: dict, path: str):
+    """
+    Write a catalog (or result) as indented UTF-8 JSON, using orjson when available.
+
+    The file is written to a temp file in the same directory and swapped in
+    with os.replace(), so an interrupted save never leaves a truncated catalog.
+
+    Catalogs are always written whole rather than as a base file plus delta
+    side-files: the JSON is what meal_planner.py, page_analyzer.py,
+    scripts/import_catalog.py and the API upload read, and none of them
+    would see pending deltas.
+    """
+    if ORJSON_AVAILABLE:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        payload = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp = tempfile.NamedTemporaryFile('wb', dir=directory, suffix='.tmp', delete=False)
+    try:
+        with tmp:
+            tmp.write(payload)
+        # NamedTemporaryFile is created 0600; keep the permissions a plain open() would give
+        if os.path.exists(path):
+            shutil.copymode(path, tmp.name)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp.name, 0o666 & ~umask)
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+
+
+def load_catalog_light(catalog_path: str, fields: tuple) -> dict:
+    """
+    Load a catalog's chapters plus only the requested fields of each recipe.
+    
+    Streams recipes one at a time with ijson when it is installed, so listing
+    commands never hold every recipe's ingredients/instructions in memory.
+    Falls back to a full load when ijson is unavailable.
+    """
+    if IJSON_AVAILABLE:
+        with open(catalog_path, 'rb') as f:
+            chapters = list(ijson.items(f, 'chapters.item', use_float=True))
+            f.seek(0)
+            recipes = [{k: r[k] for k in fields if k in r}
+                       for r in ijson.items(f, 'recipes.item', use_float=True)]
+    else:
+        catalog = load_catalog_json(catalog_path)
+        chapters = catalog.get("chapters", [])
+        recipes = [{k: r[k] for k in fields if k in r} for r in catalog.get("recipes", [])]
+    
+    return {"chapters": chapters, "recipes": recipes}
+
+
 def print_recipe_list_simple(catalog: dict):
     """Print a simple alphabetical list of recipes with numbers."""
     recipes = catalog.get("recipes", [])
@@ -1265,31 +1389,32 @@ def print_recipe_list_simple(catalog: dict):
         print("No recipes in catalog.")
         return
     
-    # Create list of (original_index, name) tuples
-    indexed_recipes = [(i + 1, r.get("name", "Unknown")) for i, r in enumerate(recipes)]
+    # Create list of (original_index, name, sub_recipe_count) tuples
+    indexed_recipes = [(i + 1, r.get("name", "Unknown"), len(r.get("sub_recipes", [])))
+                       for i, r in enumerate(recipes)]
     
     # Sort by name (case-insensitive)
     sorted_recipes = sorted(indexed_recipes, key=lambda x: x[1].lower())
     
-    print(f"\n📋 Recipes ({len(recipes)} total) - Alphabetical")
-    print("=" * 60)
+    # Build the whole listing and write it once
+    out = [f"\n📋 Recipes ({len(recipes)} total) - Alphabetical", "=" * 60]
     
-    for num, name in sorted_recipes:
-        recipe = next((r for r in recipes if r.get("name", "Unknown") == name), None)
-        sub_count = len(recipe.get("sub_recipes", [])) if recipe else 0
+    for num, name, sub_count in sorted_recipes:
         sub_str = f" (+{sub_count} sub-recipes)" if sub_count > 0 else ""
-        print(f"  {num:3}. {name}{sub_str}")
+        out.append(f"  {num:3}. {name}{sub_str}")
     
-    print("=" * 60)
-    print(f"Use --delete <num> [num2 ...] to remove recipes")
-    print(f"Use --list for detailed view with chapters and dietary info")
+    out.append("=" * 60)
+    out.append(f"Use --delete <num> [num2 ...] to remove recipes")
+    out.append(f"Use --list for detailed view with chapters and dietary info")
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def print_catalog_summary(catalog: dict):
     """Print a summary of the catalog with available chapters and recipes."""
-    print("\n" + "=" * 60)
-    print("📚 RECIPE CATALOG SUMMARY")
-    print("=" * 60)
+    out = []
+    out.append("\n" + "=" * 60)
+    out.append("📚 RECIPE CATALOG SUMMARY")
+    out.append("=" * 60)
     
     recipes = catalog.get("recipes", [])
     index = catalog.get("index", {})
@@ -1297,28 +1422,28 @@ def print_catalog_summary(catalog: dict):
     # Chapters summary
     by_chapter = index.get("by_chapter", {})
     if by_chapter:
-        print(f"\n📖 Chapters ({len(by_chapter)}):")
+        out.append(f"\n📖 Chapters ({len(by_chapter)}):")
         for chapter, chapter_recipes in by_chapter.items():
-            print(f"   • {chapter}: {len(chapter_recipes)} recipes")
+            out.append(f"   • {chapter}: {len(chapter_recipes)} recipes")
     
     # Dietary categories
     by_dietary = index.get("by_dietary", {})
     if by_dietary:
-        print(f"\n🏷️  Dietary Categories:")
+        out.append(f"\n🏷️  Dietary Categories:")
         for diet, diet_recipes in sorted(by_dietary.items()):
-            print(f"   • {diet}: {len(diet_recipes)} recipes")
+            out.append(f"   • {diet}: {len(diet_recipes)} recipes")
     
     # Macro categories
     by_macros = index.get("by_macros", {})
     if by_macros:
-        print(f"\n💪 Macro Filters:")
+        out.append(f"\n💪 Macro Filters:")
         for macro, macro_recipes in by_macros.items():
             if macro_recipes:
-                print(f"   • {macro}: {len(macro_recipes)} recipes")
+                out.append(f"   • {macro}: {len(macro_recipes)} recipes")
     
     # All recipes with numbers
-    print(f"\n📋 All Recipes ({len(recipes)}):")
-    print("-" * 60)
+    out.append(f"\n📋 All Recipes ({len(recipes)}):")
+    out.append("-" * 60)
     
     # Group by chapter for nicer display
     recipes_by_chapter = {}
@@ -1329,30 +1454,31 @@ def print_catalog_summary(catalog: dict):
         recipes_by_chapter[chapter].append((i + 1, recipe))  # 1-indexed
     
     for chapter in sorted(recipes_by_chapter.keys()):
-        print(f"\n   [{chapter}]")
+        out.append(f"\n   [{chapter}]")
         for num, recipe in recipes_by_chapter[chapter]:
             name = recipe.get("name", "Unknown")
             dietary = recipe.get("dietary_info", [])
             dietary_str = f" ({', '.join(dietary)})" if dietary and dietary != [''] else ""
-            print(f"   {num:3}. {name}{dietary_str}")
+            out.append(f"   {num:3}. {name}{dietary_str}")
             
             sub_recipes = recipe.get("sub_recipes", [])
             if sub_recipes:
-                print(f"        + {len(sub_recipes)} sub-recipes: {', '.join([s.get('name', 'Unknown') for s in sub_recipes])}")
+                out.append(f"        + {len(sub_recipes)} sub-recipes: {', '.join([s.get('name', 'Unknown') for s in sub_recipes])}")
     
     # Unmatched (recipes listed but not extracted)
     unmatched = index.get("unmatched", [])
     if unmatched:
-        print(f"\n⚠️  Not yet extracted ({len(unmatched)}):")
+        out.append(f"\n⚠️  Not yet extracted ({len(unmatched)}):")
         for item in unmatched[:5]:
-            print(f"   • {item['name']}")
+            out.append(f"   • {item['name']}")
         if len(unmatched) > 5:
-            print(f"   ... and {len(unmatched) - 5} more")
+            out.append(f"   ... and {len(unmatched) - 5} more")
     
-    print("\n" + "=" * 60)
-    print(f"Total: {len(recipes)} recipes")
-    print("Use --delete <num> [num2 ...] to remove recipes by number")
-    print("=" * 60)
+    out.append("\n" + "=" * 60)
+    out.append(f"Total: {len(recipes)} recipes")
+    out.append("Use --delete <num> [num2 ...] to remove recipes by number")
+    out.append("=" * 60)
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def process_cookbook_folder(folder_path: str, model: str = "llava", output_file: str = None, 
@@ -1398,6 +1524,9 @@ def process_cookbook_folder(folder_path: str, model: str = "llava", output_file:
         print(f"No image files found in {folder_path}")
         return {"error": "No images found"}
     
+    if not check_model_available(model, api_key):
+        return {"error": f"Model not available: {model}"}
+    
     print(f"Found {len(image_files)} images to process")
     
     # Initialize catalog structure
@@ -1416,11 +1545,12 @@ def process_cookbook_folder(folder_path: str, model: str = "llava", output_file:
     current_chapter = None
     pending_recipe = None  # Recipe that continues from previous page
     
-    for i, image_path in enumerate(image_files):
+    # Classify every page with detailed analysis up front (concurrently)
+    classifications = classify_pages([str(f) for f in image_files], model, api_key, backup_model)
+    
+    for i, (image_path, classification) in enumerate(zip(image_files, classifications)):
         print(f"\n[{i+1}/{len(image_files)}] Processing: {image_path.name}")
         
-        # Classify the page with detailed analysis
-        classification = classify_page(str(image_path), model, api_key, backup_model)
         page_type = classification.get("type", "other")
         
         print(f"  Type: {page_type} (confidence: {classification.get('confidence', 'unknown')})")
@@ -1543,8 +1673,7 @@ def process_cookbook_folder(folder_path: str, model: str = "llava", output_file:
     if output_file is None:
         output_file = folder / "recipe_catalog.json"
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(catalog, f, indent=2, ensure_ascii=False)
+    save_catalog_json(catalog, output_file)
     
     print(f"  Catalog saved to: {output_file}")
     
@@ -1569,6 +1698,9 @@ def process_single_file(file_path: str, model: str, chapter_context: dict = None
         print(f"Error: File not found: {file_path}")
         return {"error": "File not found"}
     
+    if not check_model_available(model, api_key):
+        return {"error": f"Model not available: {model}"}
+    
     print(f"Processing single file: {file_path}")
     print(f"Using model: {model}")
     print("=" * 50)
@@ -1844,19 +1976,22 @@ def process_multiple_files(file_paths: List[str], model: str, chapter_context: d
             print(f"Error: File not found: {fp}")
             return {"error": f"File not found: {fp}"}
     
+    if not check_model_available(model, api_key):
+        return {"error": f"Model not available: {model}"}
+    
     all_recipes = []
     all_chapters = []
     pending_recipe = None
     current_chapter = chapter_context
     processing_log = []
     
-    for i, file_path in enumerate(file_paths, 1):
+    # Classify all pages up front (concurrently); extraction stays in page order
+    classifications = classify_pages(file_paths, model, api_key, backup_model)
+    
+    for i, (file_path, classification) in enumerate(zip(file_paths, classifications), 1):
         print(f"\n[{i}/{len(file_paths)}] Processing: {os.path.basename(file_path)}")
         print("-" * 50)
         
-        # Classify the page
-        print("  Classifying page...")
-        classification = classify_page(file_path, model, api_key, backup_model)
         page_type = classification.get("type", "other")
         
         print(f"  Type: {page_type}")
@@ -2045,8 +2180,16 @@ def process_multiple_files(file_paths: List[str], model: str, chapter_context: d
         "recipes": all_recipes,
         "processing_log": processing_log
     }
+@functools.lru_cache(maxsize=None)
 def check_model_available(model: str, api_key: str = None) -> bool:
-    """Check if the specified model is available (Ollama or Claude)."""
+    """
+    Check if the specified model is available (Ollama or Claude).
+    
+    Called lazily by the processing functions right before the first model
+    call, and cached so the network probe happens at most once per run.
+    """
+    # Deferred like in backend.llm: -l/--list/--random/--delete never touch the network
+    import requests
     
     # Check if it's a Claude model
     is_claude = any(claude_model in model for claude_model in config.CLAUDE_VISION_MODELS) or model.startswith("claude-")
@@ -2170,7 +2313,7 @@ def main():
     )
     parser.add_argument(
         "--macro",
-        choices=["high_protein", "low_carb", "low_calorie"],
+        choices=MACRO_CHOICES,
         help="Filter random recipe by macro category"
     )
     parser.add_argument(
@@ -2205,7 +2348,7 @@ def main():
     )
     parser.add_argument(
         "--sort-by",
-        choices=["name", "date"],
+        choices=SORT_CHOICES,
         default="name",
         help="How to sort files when processing a folder: 'name' (alphabetical, default) or 'date' (oldest first by modification time)"
     )
@@ -2215,12 +2358,10 @@ def main():
     # Get API key from args or environment
     api_key = args.api_key or os.environ.get("ANTHROPIC_API_KEY")
     
-    # Check model availability (skip for --list, -l, --random, --delete which don't need a model)
-    if not args.list and not args.l and not args.random and not args.delete:
+    # Other modes check the model lazily, right before their first model call
+    if args.check_only:
         if not check_model_available(args.model, api_key):
             sys.exit(1)
-    
-    if args.check_only:
         print(f"Model '{args.model}' is available!")
         sys.exit(0)
     
@@ -2234,14 +2375,21 @@ def main():
             else:
                 catalog_path = "recipe_catalog.json"
         
-        if not os.path.isfile(catalog_path):
+        try:
+            # Simple list (-l) only needs names and chapters - skip the full parse
+            # unless chapters need fixing, which rewrites the whole file
+            if args.l:
+                light_catalog = load_catalog_light(catalog_path, LIST_FIELDS)
+                if reassign_unknown_chapters(light_catalog) == 0:
+                    print_recipe_list_simple(light_catalog)
+                    sys.exit(0)
+            
+            catalog = load_catalog_json(catalog_path)
+        except (FileNotFoundError, IsADirectoryError):
             print(f"Error: Catalog not found: {catalog_path}")
             print("Use -c/--catalog to specify the catalog path, or run on a folder first to create one.")
             sys.exit(1)
         
-        with open(catalog_path, 'r', encoding='utf-8') as f:
-            catalog = json.load(f)
-        
         # Auto-fix chapters when listing (reassign "Unknown" chapters)
         if args.l or args.list:
             reassigned = reassign_unknown_chapters(catalog)
@@ -2249,8 +2397,7 @@ def main():
                 print(f"📁 Reassigned {reassigned} recipe(s) to correct chapters")
                 # Rebuild index and save
                 catalog["index"] = build_recipe_index(catalog)
-                with open(catalog_path, 'w', encoding='utf-8') as f:
-                    json.dump(catalog, f, indent=2, ensure_ascii=False)
+                save_catalog_json(catalog, catalog_path)
                 print(f"✅ Saved updated catalog\n")
         
         # Simple alphabetical list (-l)
@@ -2274,13 +2421,14 @@ def main():
                 print(f"Valid range is 1-{total_recipes}. Use --list to see recipe numbers.")
                 sys.exit(1)
             
-            # Convert to 0-indexed and sort descending (delete from end first to preserve indices)
-            indices_to_delete = sorted([n - 1 for n in args.delete], reverse=True)
+            # Convert to 0-indexed, dedupe and sort once (ascending for display;
+            # deletion walks it in reverse to preserve indices)
+            indices_to_delete = sorted({n - 1 for n in args.delete})
             
             # Show what will be deleted
             print(f"\n🗑️  Deleting {len(indices_to_delete)} recipe(s) from: {catalog_path}")
             print("-" * 50)
-            for idx in sorted(indices_to_delete):
+            for idx in indices_to_delete:
                 recipe = recipes[idx]
                 print(f"  {idx + 1}. {recipe.get('name', 'Unknown')}")
             print("-" * 50)
@@ -2298,7 +2446,7 @@ def main():
             
             # Delete recipes (from end to preserve indices)
             deleted_names = []
-            for idx in indices_to_delete:
+            for idx in reversed(indices_to_delete):
                 deleted_names.append(recipes[idx].get("name", "Unknown"))
                 del recipes[idx]
             
@@ -2322,8 +2470,7 @@ def main():
                 }
             
             # Save updated catalog
-            with open(catalog_path, 'w', encoding='utf-8') as f:
-                json.dump(catalog, f, indent=2, ensure_ascii=False)
+            save_catalog_json(catalog, catalog_path)
             
             print(f"\n✅ Deleted {len(deleted_names)} recipe(s)")
             for name in deleted_names:
@@ -2339,11 +2486,11 @@ def main():
                 print(recipe["error"])
                 sys.exit(1)
             
-            print("\n🎲 RANDOM RECIPE PICK 🎲")
-            print("=" * 50)
-            print(f"Recipe: {recipe.get('name', 'Unknown')}")
-            print(f"Chapter: {recipe.get('chapter', 'Unknown')}")
-            print(f"Serves: {recipe.get('serves', 'N/A')}")
+            out = ["\n🎲 RANDOM RECIPE PICK 🎲"]
+            out.append("=" * 50)
+            out.append(f"Recipe: {recipe.get('name', 'Unknown')}")
+            out.append(f"Chapter: {recipe.get('chapter', 'Unknown')}")
+            out.append(f"Serves: {recipe.get('serves', 'N/A')}")
             
             # Time info
             if recipe.get('prep_time') or recipe.get('cook_time'):
@@ -2352,7 +2499,7 @@ def main():
                     times.append(f"Prep: {recipe['prep_time']}")
                 if recipe.get('cook_time'):
                     times.append(f"Cook: {recipe['cook_time']}")
-                print(f"Time: {', '.join(times)}")
+                out.append(f"Time: {', '.join(times)}")
             
             # Macros
             macros = []
@@ -2365,32 +2512,33 @@ def main():
             if recipe.get('fat'):
                 macros.append(f"{recipe['fat']} fat")
             if macros:
-                print(f"Macros: {' | '.join(macros)}")
+                out.append(f"Macros: {' | '.join(macros)}")
             
             dietary = recipe.get('dietary_info', [])
             if dietary:
-                print(f"Dietary: {', '.join(dietary)}")
+                out.append(f"Dietary: {', '.join(dietary)}")
             
-            print(f"\nIngredients:")
+            out.append(f"\nIngredients:")
             for ing in recipe.get('ingredients', []):
-                print(f"  • {ing}")
+                out.append(f"  • {ing}")
             
             for sub in recipe.get('sub_recipes', []):
-                print(f"\n{sub.get('name', 'Sub-recipe')}:")
+                out.append(f"\n{sub.get('name', 'Sub-recipe')}:")
                 for ing in sub.get('ingredients', []):
-                    print(f"  • {ing}")
+                    out.append(f"  • {ing}")
             
-            print(f"\nInstructions:")
+            out.append(f"\nInstructions:")
             for i, step in enumerate(recipe.get('instructions', []), 1):
-                print(f"  {i}. {step}")
+                out.append(f"  {i}. {step}")
             
             tips = recipe.get('tips', [])
             if tips:
-                print(f"\nTips:")
+                out.append(f"\nTips:")
                 for tip in tips:
-                    print(f"  💡 {tip}")
+                    out.append(f"  💡 {tip}")
             
-            print("=" * 50)
+            out.append("=" * 50)
+            sys.stdout.write("\n".join(out) + "\n")
             sys.exit(0)
     
     # Single or multiple file mode
@@ -2411,9 +2559,16 @@ def main():
             result = process_multiple_files(args.file, args.model, chapter_context, args.retries, api_key, args.debug, args.backup_model)
             files_processed = args.file
         
+        # Missing file or unavailable model (already reported)
+        if "error" in result:
+            sys.exit(1)
+        
         # Handle --append-to for upserting to existing catalog
         if args.append_to:
-            if not os.path.isfile(args.append_to):
+            try:
+                catalog = load_catalog_json(args.append_to)
+                print(f"Loading existing catalog: {args.append_to}")
+            except FileNotFoundError:
                 print(f"Creating new catalog: {args.append_to}")
                 catalog = {
                     "metadata": {
@@ -2425,10 +2580,6 @@ def main():
                     "recipes": [],
                     "processing_log": []
                 }
-            else:
-                print(f"Loading existing catalog: {args.append_to}")
-                with open(args.append_to, 'r', encoding='utf-8') as f:
-                    catalog = json.load(f)
             
             # Collect recipes and chapters from result
             new_recipes = result.get("recipes", [])
@@ -2449,22 +2600,27 @@ def main():
                 source_images = ", ".join([os.path.basename(f) for f in files_processed])
                 catalog, added, updated, merged = upsert_recipes(catalog, new_recipes, new_chapters, source_images)
                 
-                # Add to processing log
+                # Index the result's log entries by file (first entry wins)
+                result_log_by_file = {}
+                for entry in result.get("processing_log", []):
+                    if "file" in entry:
+                        result_log_by_file.setdefault(entry["file"], entry)
+                
+                # Add to processing log (one timestamp for the whole batch)
+                timestamp = datetime.now().isoformat()
                 for fp in files_processed:
+                    file_name = os.path.basename(fp)
                     log_entry = {
-                        "file": os.path.basename(fp),
-                        "timestamp": datetime.now().isoformat()
+                        "file": file_name,
+                        "timestamp": timestamp
                     }
-                    # Find matching log entry from result if available
-                    for entry in result.get("processing_log", []):
-                        if entry.get("file") == os.path.basename(fp):
-                            log_entry.update(entry)
-                            break
+                    # Merge matching log entry from result if available
+                    if file_name in result_log_by_file:
+                        log_entry.update(result_log_by_file[file_name])
                     catalog["processing_log"].append(log_entry)
                 
                 # Save catalog
-                with open(args.append_to, 'w', encoding='utf-8') as f:
-                    json.dump(catalog, f, indent=2, ensure_ascii=False)
+                save_catalog_json(catalog, args.append_to)
                 
                 print(f"\n✅ Catalog updated: {args.append_to}")
                 print(f"   Added: {added} recipe(s)")
@@ -2480,8 +2636,7 @@ def main():
                 output_path = args.output or f"{Path(files_processed[0]).stem}_test_result.json"
             else:
                 output_path = args.output or "multi_file_result.json"
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+            save_catalog_json(result, output_path)
             print(f"\nResults saved to: {output_path}")
         
         return
@@ -2499,50 +2654,50 @@ def main():
     # Process the folder
     if args.append_to:
         # Upsert mode - load existing catalog and add/update
-        if os.path.isfile(args.append_to):
+        try:
+            existing_catalog = load_catalog_json(args.append_to)
             print(f"Loading existing catalog for upsert: {args.append_to}")
-            with open(args.append_to, 'r', encoding='utf-8') as f:
-                existing_catalog = json.load(f)
-        else:
+        except FileNotFoundError:
             print(f"Creating new catalog: {args.append_to}")
             existing_catalog = None
         
         # Process folder normally
         new_catalog = process_cookbook_folder(args.folder, args.model, None, args.retries, api_key, args.backup_model, args.sort_by)
         
-        if "error" not in new_catalog:
-            if existing_catalog:
-                # Upsert all recipes from new catalog into existing
-                all_new_recipes = new_catalog.get("recipes", [])
-                all_new_chapters = new_catalog.get("chapters", [])
-                
-                updated_catalog, added, updated, merged = upsert_recipes(
-                    existing_catalog, all_new_recipes, all_new_chapters
-                )
-                
-                # Merge processing logs
-                updated_catalog["processing_log"].extend(new_catalog.get("processing_log", []))
-                
-                # Save
-                with open(args.append_to, 'w', encoding='utf-8') as f:
-                    json.dump(updated_catalog, f, indent=2, ensure_ascii=False)
-                
-                print(f"\n✅ Catalog upserted: {args.append_to}")
-                print(f"   Added: {added} recipe(s)")
-                print(f"   Updated: {updated} recipe(s)")
-                if merged > 0:
-                    print(f"   Merged: {merged} recipe(s) (continuations combined)")
-                print(f"   Total recipes: {len(updated_catalog['recipes'])}")
-            else:
-                # No existing catalog, just save the new one
-                with open(args.append_to, 'w', encoding='utf-8') as f:
-                    json.dump(new_catalog, f, indent=2, ensure_ascii=False)
-                print(f"\nCatalog saved to: {args.append_to}")
+        if "error" in new_catalog:
+            sys.exit(1)
+        
+        if existing_catalog:
+            # Upsert all recipes from new catalog into existing
+            all_new_recipes = new_catalog.get("recipes", [])
+            all_new_chapters = new_catalog.get("chapters", [])
+            
+            updated_catalog, added, updated, merged = upsert_recipes(
+                existing_catalog, all_new_recipes, all_new_chapters
+            )
+            
+            # Merge processing logs
+            updated_catalog["processing_log"].extend(new_catalog.get("processing_log", []))
+            
+            # Save
+            save_catalog_json(updated_catalog, args.append_to)
+            
+            print(f"\n✅ Catalog upserted: {args.append_to}")
+            print(f"   Added: {added} recipe(s)")
+            print(f"   Updated: {updated} recipe(s)")
+            if merged > 0:
+                print(f"   Merged: {merged} recipe(s) (continuations combined)")
+            print(f"   Total recipes: {len(updated_catalog['recipes'])}")
+        else:
+            # No existing catalog, just save the new one
+            save_catalog_json(new_catalog, args.append_to)
+            print(f"\nCatalog saved to: {args.append_to}")
     else:
         catalog = process_cookbook_folder(args.folder, args.model, args.output, args.retries, api_key, args.backup_model, args.sort_by)
         
-        if "error" not in catalog:
-            print("\nDone! Recipe catalog created successfully.")
+        if "error" in catalog:
+            sys.exit(1)
+        print("\nDone! Recipe catalog created successfully.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+"""
+Shared database settings for the one-shot maintenance scripts
+(migrate_exclusions, fix_null_exclusions, verify_db_schema).
+
+Import this after the script has run load_dotenv(), since the settings
+are read from the environment at import time.
+"""
+import os
+from dataclasses import dataclass
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+@dataclass(frozen=True)
+class DBConfig:
+    """Connection settings, read from the environment once at import."""
+    user: str
+    password: str
+    host: str
+    port: int
+    name: str
+    url: str
+
+    @classmethod
+    def from_env(cls):
+        user = os.getenv("DB_USERNAME", "meal_user")
+        password = os.getenv("DB_PASSWORD", "1luvMySQL!")
+        host = os.getenv("DB_HOST", "localhost")
+        port = int(os.getenv("DB_PORT", "8889"))
+        name = os.getenv("DB_DATABASE", "meal_planner")
+        # DATABASE_URL wins over the individual DB_* settings
+        url = os.getenv("DATABASE_URL") or f"mysql+pymysql://{user}:{password}@{host}:{port}/{name}"
+        return cls(user, password, host, port, name, url)
+
+CONFIG = DBConfig.from_env()
+
+_engine = None
+
+def get_engine():
+    """
+    Return the process-wide engine, creating it on first use.
+
+    These scripts run a handful of statements on one connection and exit,
+    so StaticPool hands out that single connection with no queue or overflow
+    bookkeeping, and there is no pre-ping round trip (the connection is
+    never old enough to have gone stale).
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_engine(CONFIG.url, poolclass=StaticPool, pool_pre_ping=False)
+    return _engine
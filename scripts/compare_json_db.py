@@ -4,6 +4,7 @@ import os
 import json
 import argparse
 from pathlib import Path
+from string import capwords
 
 # Add parent to path
 sys.path.append(str(Path(__file__).parent.parent))
@@ -13,10 +14,18 @@ from dotenv import load_dotenv
 env_path = Path(__file__).parent.parent / "api" / ".env"
 load_dotenv(env_path)
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, bindparam
 from sqlalchemy.orm import sessionmaker
 from api.database import SessionLocal as DefaultSessionLocal, engine as default_engine
 
+def name_key(name):
+    """
+    Lookup key for a recipe name. import_catalog stores names title-cased with
+    capwords (which also collapses whitespace), and MySQL compares them
+    case-insensitively, so match on the casefolded, whitespace-normalized name.
+    """
+    return " ".join(name.split()).casefold()
+
 def compare_data(json_path: str, db_user=None, db_pass=None, db_host="localhost", db_name="meal_planner", db_port=3306, db_socket=None):
     if not os.path.exists(json_path):
         print(f"File not found: {json_path}")
@@ -44,20 +53,38 @@ def compare_data(json_path: str, db_user=None, db_pass=None, db_host="localhost"
         Session = DefaultSessionLocal
 
     db = Session()
-    
+
     print("\n🔍 Checking Database...")
     
     issues = 0
-    
+
+    # Fetch every matching recipe and its ingredient count up front (two queries
+    # total) instead of two round-trips per JSON recipe
+    # Ask for both the JSON spelling and the title-cased one import_catalog stores
+    json_names = [r.get("name") for r in json_recipes if r.get("name")]
+    names = list(set(json_names) | {capwords(n) for n in json_names})
+    by_name = {}
+    if names:
+        rows = db.execute(
+            text("SELECT id, name, instructions, tips FROM recipes WHERE name IN :names")
+            .bindparams(bindparam("names", expanding=True)),
+            {"names": names}
+        ).mappings().all()
+        for row in rows:
+            by_name.setdefault(name_key(row["name"]), row)
+
+    ing_counts = {}
+    ids = [row["id"] for row in by_name.values()]
+    if ids:
+        ing_counts = dict(db.execute(
+            text("SELECT recipe_id, COUNT(*) FROM ingredients WHERE recipe_id IN :ids GROUP BY recipe_id")
+            .bindparams(bindparam("ids", expanding=True)),
+            {"ids": ids}
+        ).all())
+
     for r_json in json_recipes:
         name = r_json.get("name")
-        # Find in DB
-        # Use raw SQL for speed or ORM
-        # Let's use raw SQL to see exactly what is stored
-        existing = db.execute(
-            text("SELECT id, instructions, tips FROM recipes WHERE name = :name"),
-            {"name": name}
-        ).mappings().first()
+        existing = by_name.get(name_key(name)) if name else None
         
         if not existing:
             print(f"❌ MISSING in DB: {name}")
@@ -65,12 +92,10 @@ def compare_data(json_path: str, db_user=None, db_pass=None, db_host="localhost"
             continue
             
         # Check ingredients (normalized table)
-        ing_count_db = db.execute(
-            text("SELECT COUNT(*) FROM ingredients WHERE recipe_id = :rid"),
-            {"rid": existing["id"]}
-        ).scalar()
+        ing_count_db = ing_counts.get(existing["id"], 0)
         
-        ing_json = r_json.get("ingredients", [])
+        # import_catalog skips blank ingredient lines, so don't count them here either
+        ing_json = [ing for ing in r_json.get("ingredients", []) if ing and ing.strip()]
         if ing_count_db == 0 and len(ing_json) > 0:
              print(f"❌ EMPTY in DB: Ingredients for '{name}' (JSON has {len(ing_json)})")
              issues += 1
@@ -1,7 +1,10 @@
 
 import os
 import sys
+import shutil
+import signal
 import subprocess
+import time
 import argparse
 from urllib.parse import urlparse, parse_qs
 from datetime import datetime
@@ -13,6 +16,21 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 API_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), 'api')
 ENV_PATH = os.path.join(API_DIR, '.env')
 
+# Extended INSERTs in a dump grow up to this many bytes. Restoring one needs the
+# *server's* max_allowed_packet to be at least as large; the client-side
+# --max-allowed-packet passed by restore() does not raise the server's limit.
+DUMP_NET_BUFFER_LENGTH = 16 * 1024 * 1024
+
+DUMP_OPTIONS = [
+    "--single-transaction",
+    "--quick",
+    "--extended-insert",
+    "--no-autocommit",
+    f"--net-buffer-length={DUMP_NET_BUFFER_LENGTH}",
+]
+
+RESTORE_INIT_COMMAND = "SET unique_checks=0, foreign_key_checks=0"
+
 def load_config():
     if os.path.exists(ENV_PATH):
         print(f"Loading environment from {ENV_PATH}")
@@ -51,20 +69,90 @@ def parse_db_url(url):
         
     return config
 
-def run_command(cmd, env=None):
+def run_pipeline(commands, env=None, stdin_path=None, stdout_path=None):
+    """
+    Run commands (argument lists) as cmd1 | cmd2 | ... without a shell.
+    
+    stdin_path feeds the first command and stdout_path receives the last
+    one's output. Exits if any command in the pipeline fails.
+    """
+    procs = []
+    stdin = open(stdin_path, 'rb') if stdin_path else None
+    stdout = open(stdout_path, 'wb') if stdout_path else None
     try:
-        # Use shell=True for simple redirection handling, 
-        # but manual redirection with subprocess is safer/cleaner usually.
-        # However, for piping into/out of mysql, shell is easiest.
-        subprocess.run(cmd, shell=True, check=True, env=env)
-    except subprocess.CalledProcessError as e:
+        prev_stdout = stdin
+        for i, cmd in enumerate(commands):
+            is_last = i == len(commands) - 1
+            proc = subprocess.Popen(cmd, stdin=prev_stdout, stdout=stdout if is_last else subprocess.PIPE, env=env)
+            if procs:
+                # Only the next command reads this pipe, so it sees EOF/SIGPIPE properly
+                procs[-1].stdout.close()
+            procs.append(proc)
+            prev_stdout = proc.stdout
+        for proc in procs:
+            proc.wait()
+    except OSError as e:
+        for proc in procs:
+            proc.kill()
         print(f"Error executing command: {e}")
         sys.exit(1)
+    finally:
+        if stdin:
+            stdin.close()
+        if stdout:
+            stdout.close()
+    
+    failed = [(cmd, proc.returncode) for cmd, proc in zip(commands, procs) if proc.returncode != 0]
+    if failed:
+        # An upstream command killed by SIGPIPE only means a later one stopped
+        # reading, so report the command that actually failed
+        failed.sort(key=lambda item: item[1] == -signal.SIGPIPE)
+        cmd, returncode = failed[0]
+        print(f"Error executing command: '{cmd[0]}' returned non-zero exit status {returncode}.")
+        sys.exit(1)
+
+def run_command(cmd, env=None, stdin_path=None, stdout_path=None):
+    run_pipeline([cmd], env, stdin_path, stdout_path)
+
+def connection_args(config):
+    if config['socket']:
+        return ["--socket", config['socket']]
+    return ["-h", config['host'], "-P", str(config['port'])]
+
+def check_server_packet_limit(config, env):
+    """Exit with a clear message if the server would reject the dump's largest INSERTs."""
+    cmd = ["mysql"] + connection_args(config) + [
+        "-u", config['user'], "-N", "-B", "-e", "SELECT @@max_allowed_packet",
+    ]
+    try:
+        result = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True)
+        server_limit = int(result.stdout.strip())
+    except subprocess.CalledProcessError as e:
+        print(f"Error: Could not read the server's max_allowed_packet: {e.stderr.strip() or e}")
+        sys.exit(1)
+    except ValueError:
+        print(f"Error: Unexpected max_allowed_packet from the server: {result.stdout.strip()!r}")
+        sys.exit(1)
+    if server_limit < DUMP_NET_BUFFER_LENGTH:
+        print(f"Error: The server's max_allowed_packet is {server_limit} bytes, but backups contain "
+              f"INSERT statements of up to {DUMP_NET_BUFFER_LENGTH} bytes.")
+        print(f"Raise it on the server first, e.g. SET GLOBAL max_allowed_packet = {DUMP_NET_BUFFER_LENGTH}; "
+              f"(or max_allowed_packet=16M under [mysqld] in my.cnf).")
+        sys.exit(1)
 
-def backup(config, output_file=None):
+def require_zstd():
+    if not shutil.which("zstd"):
+        print("Error: zstd not found. Install it (e.g. apt install zstd) or back up without --compress.")
+        sys.exit(1)
+
+def backup(config, output_file=None, compress=False):
+    if compress:
+        require_zstd()
     if not output_file:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         output_file = f"backup_{config['dbname']}_{timestamp}.sql"
+        if compress:
+            output_file += ".zst"
     
     print(f"Backing up database '{config['dbname']}' to '{output_file}'...")
     
@@ -76,56 +164,120 @@ def backup(config, output_file=None):
     if config['password']:
         env['MYSQL_PWD'] = config['password']
         
-    cmd_parts = ["mysqldump"]
-    
-    if config['socket']:
-        cmd_parts.extend(["--socket", config['socket']])
-    else:
-        cmd_parts.extend(["-h", config['host']])
-        cmd_parts.extend(["-P", str(config['port'])])
-        
+    cmd_parts = ["mysqldump"] + connection_args(config)
     cmd_parts.extend(["-u", config['user']])
     
     # Add routines/events if you want full backup
     cmd_parts.extend(["--routines", "--events"])
     
+    # Consistent InnoDB snapshot without table locks, rows streamed from the
+    # server instead of buffered, and few large multi-row INSERTs (which also
+    # commit per table on restore thanks to --no-autocommit)
+    cmd_parts.extend(DUMP_OPTIONS)
+    
     cmd_parts.append(config['dbname'])
     
-    # Redirection
-    cmd_str = " ".join(cmd_parts) + f" > {output_file}"
+    if compress:
+        # Multi-threaded zstd keeps up with mysqldump and shrinks SQL text 3-5x
+        run_pipeline([cmd_parts, ["zstd", "-T0", "-3", "-q", "-f", "-o", output_file]], env)
+    else:
+        run_command(cmd_parts, env, stdout_path=output_file)
+    print("Backup successful!")
+
+def require_tool(name):
+    if not shutil.which(name):
+        print(f"Error: {name} not found. Install mydumper or run without --parallel.")
+        sys.exit(1)
+
+def backup_parallel(config, output_dir=None):
+    """Dump with mydumper: one thread per core, tables split into 50 MB chunks."""
+    require_tool("mydumper")
+    if not output_dir:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_dir = f"backup_{config['dbname']}_{timestamp}"
+    
+    print(f"Backing up database '{config['dbname']}' to directory '{output_dir}' with mydumper...")
     
-    run_command(cmd_str, env)
+    env = os.environ.copy()
+    if config['password']:
+        env['MYSQL_PWD'] = config['password']
+    
+    cmd_parts = ["mydumper"] + connection_args(config) + [
+        "-u", config['user'],
+        "-B", config['dbname'],
+        "--threads", str(os.cpu_count() or 1),
+        "--chunk-filesize", "50",
+        "--compress",
+        "--triggers", "--events", "--routines",
+        "--outputdir", output_dir,
+    ]
+    
+    run_command(cmd_parts, env)
     print("Backup successful!")
 
+def restore_parallel(config, input_dir):
+    """Load a mydumper directory with myloader, one thread per core."""
+    require_tool("myloader")
+    
+    print(f"Restoring database '{config['dbname']}' from directory '{input_dir}' with myloader...")
+    print("WARNING: This will overwrite existing data. Proceeding in 3 seconds...")
+    time.sleep(3)
+    
+    env = os.environ.copy()
+    if config['password']:
+        env['MYSQL_PWD'] = config['password']
+    
+    cmd_parts = ["myloader"] + connection_args(config) + [
+        "-u", config['user'],
+        "-B", config['dbname'],
+        "--threads", str(os.cpu_count() or 1),
+        "--overwrite-tables",
+        "--directory", input_dir,
+    ]
+    
+    run_command(cmd_parts, env)
+    print("Restore successful!")
+
 def restore(config, input_file):
     if not os.path.exists(input_file):
         print(f"Error: Input file '{input_file}' not found.")
         sys.exit(1)
+    
+    # A directory is a mydumper backup (backup --parallel)
+    if os.path.isdir(input_file):
+        restore_parallel(config, input_file)
+        return
         
     print(f"Restoring database '{config['dbname']}' from '{input_file}'...")
     print("WARNING: This will overwrite existing data. Proceeding in 3 seconds...")
-    import time
     time.sleep(3)
     
     env = os.environ.copy()
     if config['password']:
         env['MYSQL_PWD'] = config['password']
-        
-    cmd_parts = ["mysql"]
     
-    if config['socket']:
-        cmd_parts.extend(["--socket", config['socket']])
-    else:
-        cmd_parts.extend(["-h", config['host']])
-        cmd_parts.extend(["-P", str(config['port'])])
+    check_server_packet_limit(config, env)
         
+    cmd_parts = ["mysql"] + connection_args(config)
     cmd_parts.extend(["-u", config['user']])
+    # Skip per-row unique/foreign key checks while loading, and let the client
+    # send the large extended INSERTs the dump side produces (the server limit
+    # is checked above)
+    cmd_parts.append(f"--init-command={RESTORE_INIT_COMMAND}")
+    cmd_parts.append("--max-allowed-packet=1G")
     cmd_parts.append(config['dbname'])
     
-    # Input redirection
-    cmd_str = " ".join(cmd_parts) + f" < {input_file}"
+    pipeline = [cmd_parts]
+    # .zst backups are decompressed on the fly
+    if input_file.endswith(".zst"):
+        require_zstd()
+        pipeline.insert(0, ["zstd", "-dc"])
     
-    run_command(cmd_str, env)
+    # pv streams the file with a progress bar when it is installed
+    if shutil.which("pv"):
+        run_pipeline([["pv", input_file]] + pipeline, env)
+    else:
+        run_pipeline(pipeline, env, stdin_path=input_file)
     print("Restore successful!")
 
 def main():
@@ -135,10 +287,12 @@ def main():
     # Backup
     parser_backup = subparsers.add_parser("backup", help="Backup database to SQL file")
     parser_backup.add_argument("-o", "--output", help="Output filename (optional)")
+    parser_backup.add_argument("-z", "--compress", action="store_true", help="Compress the dump with zstd (.sql.zst)")
+    parser_backup.add_argument("--parallel", action="store_true", help="Dump with mydumper using all cores (output is a directory)")
     
     # Restore
     parser_restore = subparsers.add_parser("restore", help="Restore database from SQL file")
-    parser_restore.add_argument("input", help="Input SQL file")
+    parser_restore.add_argument("input", help="Input SQL file (.sql or .sql.zst) or mydumper directory")
     
     args = parser.parse_args()
     
@@ -149,7 +303,10 @@ def main():
     config = load_config()
     
     if args.command == "backup":
-        backup(config, args.output)
+        if args.parallel:
+            backup_parallel(config, args.output)
+        else:
+            backup(config, args.output, compress=args.compress)
     elif args.command == "restore":
         restore(config, args.input)
 
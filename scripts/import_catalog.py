@@ -1,9 +1,19 @@
 
 import sys
 import os
+import re
 import json
+import shelve
+import hashlib
+import tempfile
 import argparse
+import queue
+import threading
 from pathlib import Path
+from string import capwords
+from contextlib import contextmanager
+from itertools import repeat
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 # Add parent directory to path to import api
 sys.path.append(str(Path(__file__).parent.parent))
@@ -23,258 +33,799 @@ except ImportError:
     pass  # python-dotenv not installed; rely on shell environment
 
 from sqlalchemy.orm import Session
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, select, insert, update, delete, Enum, String, JSON
 from sqlalchemy.orm import sessionmaker
 from api.database import SessionLocal as DefaultSessionLocal, engine as default_engine, Base
-from api.models.orm import Catalog, Chapter, Recipe, Ingredient
-from backend.llm import query_llm, parse_json_response
-import time
+from api.models.orm import Catalog, Chapter, Recipe, Ingredient, MealPlanRecipe
+from backend import config
+from backend.llm import query_llm, parse_json_response, is_claude_model
 
-def import_catalog(json_path: str, db: Session, verbose: bool = False, enrich: bool = False):
-    """Import a JSON catalog into the database."""
-    print(f"Reading catalog from {json_path}...")
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: the enrichment cache is used without a cross-process lock
+
+def json_dumps(value):
+    """Encode JSON column values: orjson when installed (several times faster), else json.dumps."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(value)
+
+# --- SANITIZATION HELPERS ---
+# Extracts "123 kcal" or "10 mins" from a longer LLM answer
+_SHORT_RE = re.compile(r'(\d+(?:-\d+)?\s*\w+)')
+
+VALID_MEAL_TYPES = frozenset({'breakfast', 'lunch', 'dinner', 'dessert', 'snack', 'main', 'side', 'any'})
+VALID_DISH_ROLES = frozenset({'main', 'side', 'sub_recipe'})
+# Placeholder answers the LLM gives instead of leaving a field blank
+EMPTY_ANSWERS = frozenset({"not provided", "n/a", "unavailable", "unknown"})
+
+def to_title_case(s):
+    if not s:
+        return s
+    return capwords(s)
+
+def clean_meal_type(mt):
+    if not mt: return "any"
+    mt = mt.lower().strip()
+    if mt in VALID_MEAL_TYPES:
+        return mt
+    # Mappings
+    if "condiment" in mt or "sauce" in mt: return "side"
+    if "appetizer" in mt: return "snack"
+    if "soup" in mt or "salad" in mt: return "lunch" # Arbitrary but safer
+    return "any"
+
+def clean_dish_role(role):
+    if not role: return "main"
+    role = str(role).lower().strip()
+    return role if role in VALID_DISH_ROLES else "main"
+
+def clean_short_string(s, max_len=20):
+    if not s: return ""
+    s = str(s).strip()
+    if s.lower() in EMPTY_ANSWERS:
+        return ""
+    # If too long, try to extract digits + unit
+    if len(s) > max_len:
+        match = _SHORT_RE.search(s)
+        if match:
+            return match.group(1)[:max_len]
+        return s[:max_len]
+    return s
+
+# Recipes are written and committed in chunks of this many rows, so neither
+# the session nor a single INSERT grows with the size of the catalog
+IMPORT_CHUNK_SIZE = 500
+
+# Claude calls are mostly waiting on the API, so enrichment runs this many at once
+# (a local Ollama server answers one request at a time, so it is queried serially)
+MAX_ENRICH_WORKERS = 8
+
+def build_enrich_prompt(recipe_name, ingredients, instructions):
+    return f"""
+    Analyze this recipe and provide the missing metadata in JSON format.
+    Recipe: {recipe_name}
+    Ingredients: {'; '.join(ingredients)}
+    Instructions: {'; '.join(instructions[:5])}...
+
+    Return a JSON object with these keys (estimate if needed):
+    {{
+        "calories": "e.g. 500 kcal per serving",
+        "protein": "e.g. 30g per serving",
+        "carbs": "e.g. 40g per serving", 
+        "fat": "e.g. 20g per serving",
+        "prep_time": "e.g. 15 mins",
+        "cook_time": "e.g. 30 mins",
+        "total_time": "e.g. 45 mins",
+        "serves": "e.g. 4",
+        "meal_type": "One of: breakfast, lunch, dinner, snack, dessert",
+        "meal_type": "One of: breakfast, lunch, dinner, snack, dessert",
+        "dish_role": "One of: main, side, sub_recipe",
+        "sub_recipes": ["List of recipe names mentioned in ingredients, e.g. 'Basic Pie Crust', 'Tartar Sauce'. Empty if none."]
+    }}
+    Output ONLY JSON.
+    """
+
+def is_missing(r_data, key, sentinel=""):
+    value = r_data.get(key)
+    return not value or value == sentinel
+
+# A recipe is sent for enrichment when any of these is missing (or equals the placeholder)
+ENRICH_TRIGGER_FIELDS = (("calories", ""), ("prep_time", ""), ("cook_time", ""), ("meal_type", "any"))
+
+# Short text fields filled from the LLM answer, with the length clean_short_string keeps
+SHORT_FIELD_LIMITS = {
+    "calories": 20, "protein": 20, "carbs": 20, "fat": 20,
+    # Times can be a bit longer (50 chars), but clean anyway
+    "prep_time": 45, "cook_time": 45, "total_time": 45,
+}
+
+def apply_enrichment(r_data, enriched_data):
+    """Copy sanitized LLM answers into the recipe's missing fields."""
+    updates = {
+        key: clean_short_string(enriched_data.get(key, ""), max_len)
+        for key, max_len in SHORT_FIELD_LIMITS.items()
+        if is_missing(r_data, key)
+    }
+    
+    if is_missing(r_data, "meal_type", "any"):
+        updates["meal_type"] = clean_meal_type(enriched_data.get("meal_type", "dinner"))
+    
+    if is_missing(r_data, "dish_role"):
+        updates["dish_role"] = clean_dish_role(enriched_data.get("dish_role", "main"))
+        
+    # Enrich sub_recipes if missing
+    if is_missing(r_data, "sub_recipes") and enriched_data.get("sub_recipes"):
+        updates["sub_recipes"] = enriched_data["sub_recipes"]
+        
+    if is_missing(r_data, "serves"):
+        updates["serves"] = clean_short_string(str(enriched_data.get("serves", "1")), 45)
+    
+    r_data.update(updates)
+
+def enrich_cache_key(prompt):
+    # Answers depend on the model as well as the prompt
+    return hashlib.sha256(f"{config.DEFAULT_MODEL}\n{prompt}".encode("utf-8")).hexdigest()
+
+def ask_llm(prompt):
+    try:
+        return query_llm(prompt, json_mode=True)
+    except Exception as e:
+        print(f"    ⚠️ LLM error: {e}")
+        return None
+
+@contextmanager
+def locked_enrich_cache():
+    """Open the answer cache under an exclusive lock; parallel imports share the file."""
+    with open(config.ENRICH_CACHE_FILE + ".lock", "w") as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        with shelve.open(config.ENRICH_CACHE_FILE) as cache:
+            yield cache
+
+def fetch_enrichments(prompts, use_cache: bool = True):
+    """
+    Return the LLM answer for each prompt, in order.
+    
+    Answers are cached on disk by prompt hash (config.ENRICH_CACHE_FILE), so
+    re-importing a catalog only calls the LLM for recipes that changed.
+    Cache misses are sent concurrently when config.DEFAULT_MODEL is a Claude
+    model; the cache is only locked while it is read and written, never during
+    the LLM calls.
+    """
+    answers = [None] * len(prompts)
+    if not prompts:
+        return answers
+
+    keys = [enrich_cache_key(prompt) for prompt in prompts]
+    if use_cache:
+        try:
+            with locked_enrich_cache() as cache:
+                answers = [cache.get(key) for key in keys]
+        except Exception as e:
+            print(f"    ⚠️ Enrichment cache unavailable ({e}), calling the LLM for every recipe")
+            use_cache = False
+
+    misses = [i for i, answer in enumerate(answers) if answer is None]
+    if not misses:
+        return answers
+
+    if is_claude_model(config.DEFAULT_MODEL):
+        with ThreadPoolExecutor(max_workers=min(MAX_ENRICH_WORKERS, len(misses))) as executor:
+            fetched = list(executor.map(ask_llm, [prompts[i] for i in misses]))
+    else:
+        fetched = [ask_llm(prompts[i]) for i in misses]
+    for i, answer in zip(misses, fetched):
+        answers[i] = answer
+
+    # Only keep answers that parse, so failures are retried next time
+    fresh = {keys[i]: answers[i] for i in misses if parse_json_response(answers[i])}
+    if use_cache and fresh:
+        try:
+            with locked_enrich_cache() as cache:
+                cache.update(fresh)
+        except Exception as e:
+            print(f"    ⚠️ Could not update enrichment cache: {e}")
+
+    return answers
+
+def enrich_recipes(recipes, verbose: bool = False, use_cache: bool = True):
+    """
+    Use the LLM to fill missing metadata (calories, times, meal type...) in place.
     
+    Prompts for the whole batch are answered from the cache or sent
+    concurrently, then the answers are applied in recipe order. Returns the
+    recipes that did not error out.
+    """
+    to_enrich = []
+    failed = set()
+    for r_data in recipes:
+        try:
+            # Check for missing critical fields
+            missing_fields = [key for key, sentinel in ENRICH_TRIGGER_FIELDS if is_missing(r_data, key, sentinel)]
+
+            if missing_fields:
+                recipe_name = to_title_case(r_data.get("name") or "Unknown Recipe")
+                if verbose:
+                    print(f"  🧠 Enriching '{recipe_name}' (Missing: {', '.join(missing_fields)})...")
+                prompt = build_enrich_prompt(recipe_name, r_data.get("ingredients", []), r_data.get("instructions", []))
+                to_enrich.append((r_data, recipe_name, prompt))
+        except Exception as e:
+            print(f"❌ Error importing recipe {r_data.get('name')}: {e}")
+            failed.add(id(r_data))
+
+    responses = fetch_enrichments([prompt for _, _, prompt in to_enrich], use_cache)
+
+    for (r_data, recipe_name, _), ai_response in zip(to_enrich, responses):
+        enriched_data = parse_json_response(ai_response)
+        if not enriched_data:
+            print(f"    ⚠️ Failed to enrich '{recipe_name}'")
+            continue
+        try:
+            apply_enrichment(r_data, enriched_data)
+        except Exception as e:
+            print(f"❌ Error importing recipe {r_data.get('name')}: {e}")
+            failed.add(id(r_data))
+            continue
+        if verbose: print(f"    ✨ Enriched: {r_data.get('meal_type')} | {r_data.get('calories')}")
+
+    return [r_data for r_data in recipes if id(r_data) not in failed]
+
+# Recipe columns stored as short text; missing values become ""
+STRING_FIELDS = ("chapter_number", "page_number", "serves", "prep_time", "cook_time", "total_time",
+                 "calories", "protein", "carbs", "fat")
+
+def prepare_recipe_row(r_data, catalog_id):
+    """
+    Map a catalog recipe onto a recipes-table row. Returns (row, ingredients).
+    
+    Pure Python with no database access, so whole chunks are prepared before
+    any INSERT runs. meal_type / dish_role are resolved to values the
+    columns accept ("Dinner" -> "dinner", unknown -> "any" / "main").
+    """
+    get = r_data.get  # bound once; called ~25 times per recipe
+    tips = get("tips", [])
+    sub = get("sub_recipes", [])
+    diet = get("dietary_info", [])
+    imgs = get("source_images", []) # or "source_image" handling
+    
+    # Normalize source_images
+    if "source_image" in r_data and not imgs:
+        imgs = [r_data["source_image"]]
+
+    row = {
+        "catalog_id": catalog_id,
+        "name": to_title_case(get("name") or "Unknown Recipe"),
+        "chapter": get("chapter"),
+        "meal_type": clean_meal_type(get("meal_type")),
+        "dish_role": clean_dish_role(get("dish_role", "main")),
+        "nutrition_full": get("nutrition_full"),
+        "description": get("description"),
+        "instructions": get("instructions", []),
+        "tips": tips,
+        "sub_recipes": sub,
+        "dietary_info": diet,
+        "is_complete": get("is_complete", True),
+        "source_images": imgs
+    }
+    # page_number might not exist in JSON yet; numbers (serves: 4) are stringified
+    for key in STRING_FIELDS:
+        value = get(key)
+        row[key] = "" if value is None else value if isinstance(value, str) else str(value)
+    # Blank lines left over from page extraction are dropped instead of stored as empty rows
+    ingredients = [ing.strip() for ing in get("ingredients", []) if ing and ing.strip()]
+    return row, ingredients
+
+def prepare_chapter_row(chap_data, catalog_id):
+    """Map a catalog chapter onto a chapters-table row."""
+    number = chap_data.get("chapter_number")
+    return {
+        "catalog_id": catalog_id,
+        # Same rule as the recipe STRING_FIELDS: a JSON null is stored as "", not "None"
+        "chapter_number": "" if number is None else str(number),
+        "chapter_title": chap_data.get("chapter_title"),
+        "recipe_list": chap_data.get("recipe_list", [])
+    }
+
+# Escapes for LOAD DATA's default tab-separated format (ESCAPED BY '\\')
+TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+def tsv_field(value, is_json=False):
+    """Format one value for LOAD DATA: \\N for NULL, JSON columns as JSON text."""
+    if is_json:
+        value = json_dumps(value)
+    elif value is None:
+        return "\\N"
+    elif isinstance(value, bool):
+        value = int(value)
+    return str(value).translate(TSV_ESCAPES)
+
+def load_rows_infile(db: Session, table, rows):
+    """
+    Send rows (dicts with the same keys) to MySQL/MariaDB as one
+    LOAD DATA LOCAL INFILE upload and return the result.
+    
+    Needs local_infile enabled on the server and on the connection
+    (see --load-data in main()).
+    """
+    columns = list(rows[0])
+    json_columns = [isinstance(table.c[col].type, JSON) for col in columns]
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", newline="\n", suffix=".tsv", delete=False) as tmp:
+        for row in rows:
+            tmp.write("\t".join(tsv_field(row[col], is_json) for col, is_json in zip(columns, json_columns)) + "\n")
     try:
+        return db.connection().exec_driver_sql(
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {table.name} CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+            f"({', '.join(columns)})",
+            (tmp.name,)
+        )
+    finally:
+        os.unlink(tmp.name)
+
+# Column constraints recipe_row_problem checks, read from the ORM once instead
+# of per row (Enum subclasses String, so it is excluded from the length limits)
+RECIPE_ENUM_VALUES = {
+    col.name: frozenset(col.type.enums) for col in Recipe.__table__.c if isinstance(col.type, Enum)
+}
+RECIPE_STRING_LIMITS = {
+    col.name: col.type.length for col in Recipe.__table__.c
+    if isinstance(col.type, String) and not isinstance(col.type, Enum) and col.type.length
+}
+INGREDIENT_TEXT_LIMIT = Ingredient.__table__.c.ingredient_text.type.length
+
+def recipe_row_problem(row, ingredients):
+    """
+    Return why the database would reject this recipe, or None.
+    
+    Checks the Enum values and String lengths a strict-mode server enforces, so
+    a bad recipe is reported on its own instead of failing its whole chunk.
+    """
+    enum_values = RECIPE_ENUM_VALUES.get
+    string_limit = RECIPE_STRING_LIMITS.get
+    for key, value in row.items():
+        allowed = enum_values(key)
+        if allowed is not None:
+            if value not in allowed:
+                return f"invalid {key} '{value}'"
+            continue
+        limit = string_limit(key)
+        if limit and isinstance(value, str) and len(value) > limit:
+            return f"{key} is longer than {limit} characters"
+
+    for ing_text in ingredients:
+        if len(ing_text) > INGREDIENT_TEXT_LIMIT:
+            return f"ingredient '{ing_text[:40]}...' is longer than {INGREDIENT_TEXT_LIMIT} characters"
+    return None
+
+# Budget for one multi-row INSERT statement, half of the 16MB max_allowed_packet
+# default (MariaDB, MySQL 5.7) to leave room for quoting and escaping
+MAX_INSERT_BYTES = 8_000_000
+
+def batches_by_size(rows, max_bytes=MAX_INSERT_BYTES):
+    """Split rows into runs whose approximate encoded size stays under max_bytes."""
+    batch, size = [], 0
+    for row in rows:
+        row_size = len(json_dumps(row))
+        if batch and size + row_size > max_bytes:
+            yield batch
+            batch, size = [], 0
+        batch.append(row)
+        size += row_size
+    if batch:
+        yield batch
+
+def has_consecutive_insert_ids(db: Session):
+    """
+    True when a multi-row INSERT gets consecutive AUTO_INCREMENT ids starting
+    at LAST_INSERT_ID(): InnoDB lock mode 0/1 ("traditional"/"consecutive")
+    and an increment of 1. Lock mode 2 may interleave ids between sessions.
+    
+    Checked once per pooled connection (the answer is kept in its .info),
+    not once per chunk.
+    """
+    if db.get_bind().dialect.name not in ("mysql", "mariadb"):
+        return False
+    conn = db.connection()
+    if "consecutive_insert_ids" not in conn.info:
+        lock_mode, increment = conn.exec_driver_sql(
+            "SELECT @@innodb_autoinc_lock_mode, @@auto_increment_increment"
+        ).one()
+        conn.info["consecutive_insert_ids"] = int(lock_mode) <= 1 and int(increment) == 1
+    return conn.info["consecutive_insert_ids"]
+
+def load_recipes_infile(db: Session, recipe_rows):
+    """
+    LOAD DATA the recipe rows and return their ids, in row order.
+    
+    LOAD DATA takes the table-level AUTO-INC lock in lock modes 0/1, so the
+    rows are numbered consecutively from LAST_INSERT_ID(). The OK packet's
+    insert id is always 0 for LOAD DATA, so the id is read back explicitly,
+    and the range is only trusted if every row was loaded without a warning
+    (LOCAL turns row errors into warnings and skips the row). Otherwise this
+    raises, so the chunk is rolled back instead of keying ingredients to the
+    wrong recipes (foreign key checks are off here).
+    """
+    result = load_rows_infile(db, Recipe.__table__, recipe_rows)
+    first_id, warnings = db.connection().exec_driver_sql("SELECT LAST_INSERT_ID(), @@warning_count").one()
+    if result.rowcount != len(recipe_rows) or warnings or not first_id:
+        raise RuntimeError(
+            f"LOAD DATA loaded {result.rowcount} of {len(recipe_rows)} recipes "
+            f"with {warnings} warning(s); recipe ids cannot be trusted"
+        )
+    return list(range(first_id, first_id + len(recipe_rows)))
+
+def load_ingredients_infile(db: Session, ingredient_rows):
+    """
+    LOAD DATA the ingredient rows, raising unless every row was loaded cleanly.
+    
+    LOCAL skips bad rows with only a warning, so without this check a recipe
+    could be committed with part of its ingredient list missing.
+    """
+    result = load_rows_infile(db, Ingredient.__table__, ingredient_rows)
+    warnings = db.connection().exec_driver_sql("SELECT @@warning_count").scalar()
+    if result.rowcount != len(ingredient_rows) or warnings:
+        raise RuntimeError(
+            f"LOAD DATA loaded {result.rowcount} of {len(ingredient_rows)} ingredients "
+            f"with {warnings} warning(s)"
+        )
+
+@contextmanager
+def relaxed_checks(db: Session):
+    """
+    Turn off unique and foreign key checks for this session's connection
+    while a chunk is written (MySQL/MariaDB only; a no-op elsewhere).
+    
+    Every key the chunk references is the catalog or a recipe id the import
+    itself just created, so the per-row lookups are pure overhead. The
+    variables are session-scoped and are always restored, because the
+    connection goes back to the pool afterwards.
+    """
+    if db.get_bind().dialect.name not in ("mysql", "mariadb"):
+        yield False
+        return
+    raw_conn = db.connection().connection
+    with raw_conn.cursor() as cursor:
+        cursor.execute("SET unique_checks=0, foreign_key_checks=0")
+    try:
+        yield True
+    finally:
+        with raw_conn.cursor() as cursor:
+            cursor.execute("SET unique_checks=1, foreign_key_checks=1")
+
+def insert_recipe_rows(db: Session, recipe_rows, recipe_ingredients, load_data: bool = False):
+    """INSERT recipe rows plus their ingredients and commit. Raises on database errors."""
+    # Rows are fully built and validated before this point, so the
+    # transaction only spans the INSERTs themselves
+    with relaxed_checks(db) as is_mysql:
+        if load_data and has_consecutive_insert_ids(db):
+            recipe_ids = load_recipes_infile(db, recipe_rows)
+        elif db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+            # One INSERT ... RETURNING hands back the ids in row order (MariaDB 10.5+, SQLite)
+            recipe_ids = db.scalars(
+                insert(Recipe).returning(Recipe.id, sort_by_parameter_order=True),
+                recipe_rows
+            ).all()
+        elif has_consecutive_insert_ids(db):
+            # MySQL / MariaDB < 10.5: multi-row INSERTs, whose ids run on from
+            # LAST_INSERT_ID() (the first row's id) of each statement
+            recipe_ids = []
+            for batch in batches_by_size(recipe_rows):
+                result = db.execute(insert(Recipe.__table__).values(batch))
+                recipe_ids.extend(range(result.lastrowid, result.lastrowid + len(batch)))
+        else:
+            # Interleaved auto-increment: return_defaults fills in each row's "id",
+            # one INSERT per recipe
+            db.bulk_insert_mappings(Recipe, recipe_rows, return_defaults=True)
+            recipe_ids = [row["id"] for row in recipe_rows]
+
+        ingredient_rows = [
+            {"recipe_id": recipe_id, "ingredient_text": ing_text, "sort_order": idx}
+            for recipe_id, ingredients in zip(recipe_ids, recipe_ingredients)
+            for idx, ing_text in enumerate(ingredients)
+        ]
+        if load_data and is_mysql:
+            if ingredient_rows:
+                load_ingredients_infile(db, ingredient_rows)
+        else:
+            db.bulk_insert_mappings(Ingredient, ingredient_rows)
+    db.commit()
+
+def insert_recipes_bisect(db: Session, recipe_rows, recipe_ingredients, load_data: bool = False):
+    """
+    Insert a batch, splitting it in half on a database error until the failing
+    recipe is isolated. Returns the rows that were imported.
+    """
+    try:
+        insert_recipe_rows(db, recipe_rows, recipe_ingredients, load_data)
+        return recipe_rows
+    except Exception as e:
+        db.rollback()
+        for row in recipe_rows:
+            row.pop("id", None)  # set by return_defaults before the rollback
+        if len(recipe_rows) == 1:
+            print(f"❌ Error importing recipe {recipe_rows[0]['name']}: {e}")
+            return []
+
+    mid = len(recipe_rows) // 2
+    return (insert_recipes_bisect(db, recipe_rows[:mid], recipe_ingredients[:mid], load_data)
+            + insert_recipes_bisect(db, recipe_rows[mid:], recipe_ingredients[mid:], load_data))
+
+def import_recipe_chunk(db: Session, catalog_id, recipes, verbose: bool = False, enrich: bool = False,
+                        load_data: bool = False, use_cache: bool = True):
+    """Enrich (optionally) and bulk insert one chunk of recipes plus their ingredients. Returns the number imported."""
+    # Enrichment runs before this chunk touches the session, so no pooled
+    # connection sits idle while the LLM calls are in flight
+    if enrich:
+        recipes = enrich_recipes(recipes, verbose, use_cache)
+
+    # Build and validate every row in Python first; only rows that should
+    # insert cleanly reach the database
+    recipe_rows = []
+    recipe_ingredients = []
+    for r_data in recipes:
+        try:
+            row, ingredients = prepare_recipe_row(r_data, catalog_id)
+            problem = recipe_row_problem(row, ingredients)
+        except Exception as e:
+            problem = e
+        if problem:
+            print(f"❌ Error importing recipe {r_data.get('name')}: {problem}")
+            continue
+        recipe_rows.append(row)
+        recipe_ingredients.append(ingredients)
+
+    if not recipe_rows:
+        return 0
+
+    imported = insert_recipes_bisect(db, recipe_rows, recipe_ingredients, load_data)
+
+    # Nothing from this chunk is read again; keep the identity map from growing
+    db.expunge_all()
+
+    if verbose:
+        for row in imported:
+            print(f"  Imported: {row['name']}")
+    return len(imported)
+
+def read_catalog_stream(json_path: str):
+    """
+    Return (metadata, chapters, recipes) for a catalog file.
+    
+    With ijson installed the recipes come back as a generator that parses one
+    recipe at a time, so large catalogs are never fully held in memory.
+    Without it the whole file is loaded with json.load.
+    """
+    if not IJSON_AVAILABLE:
         with open(json_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
+        return data.get("metadata", {}), data.get("chapters", []), data.get("recipes", [])
+
+    with open(json_path, 'rb') as f:
+        # metadata is the first key in catalogs written by recipe_cataloger.py,
+        # so this stops almost immediately
+        metadata = next(ijson.items(f, 'metadata', use_float=True), {})
+        f.seek(0)
+        chapters = list(ijson.items(f, 'chapters.item', use_float=True))
+
+    def iter_recipes():
+        with open(json_path, 'rb') as f:
+            try:
+                yield from ijson.items(f, 'recipes.item', use_float=True)
+            except ijson.JSONError as e:
+                print(f"Error reading file: {e}")
+
+    return metadata, chapters, iter_recipes()
+
+def read_ahead(items, batch_size=IMPORT_CHUNK_SIZE, depth=2):
+    """
+    Yield items from an iterator that a background thread keeps advancing,
+    handing them over batch_size at a time through a queue at most `depth`
+    batches deep. With a streaming ijson reader this parses the next chunk
+    of the file while the current one is being written to the database.
+    """
+    handoff = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(value):
+        # Give up if the consumer went away, instead of blocking forever
+        while not stop.is_set():
+            try:
+                handoff.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        batch = []
+        try:
+            for item in items:
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    if not put(batch):
+                        return
+                    batch = []
+            if batch:
+                put(batch)
+        except Exception as e:
+            put(e)
+        finally:
+            put(done)
+
+    producer = threading.Thread(target=produce, name="catalog-reader", daemon=True)
+    producer.start()
+    try:
+        while True:
+            batch = handoff.get()
+            if batch is done:
+                break
+            if isinstance(batch, Exception):
+                raise batch
+            yield from batch
+    finally:
+        stop.set()
+        producer.join()
+
+def catalog_name_for(json_path: str):
+    """Catalog name inferred from the file name (builder_staples.json -> 'Builder Staples')."""
+    return Path(json_path).stem.replace('_', ' ').title()
+
+def find_existing_catalog(db: Session, name, source_folder):
+    """Id of a catalog already imported under this name and source folder, or None."""
+    return db.scalar(
+        select(Catalog.id).where(Catalog.name == name, Catalog.source_folder == source_folder).limit(1)
+    )
+
+def remove_catalog(db: Session, catalog_id):
+    """
+    Delete a catalog the way DELETE /api/catalogs/{id} does: recipes used in a
+    meal plan are kept but unlinked (catalog_id = NULL), the rest are deleted
+    with their ingredients. Set-based, so the cost doesn't grow with round
+    trips per recipe. Does not commit.
+    """
+    in_plans = select(MealPlanRecipe.recipe_id)
+    db.execute(update(Recipe).where(Recipe.catalog_id == catalog_id, Recipe.id.in_(in_plans)).values(catalog_id=None))
+    db.execute(delete(Ingredient).where(Ingredient.recipe_id.in_(select(Recipe.id).where(Recipe.catalog_id == catalog_id))))
+    db.execute(delete(Recipe).where(Recipe.catalog_id == catalog_id))
+    db.execute(delete(Chapter).where(Chapter.catalog_id == catalog_id))
+    db.execute(delete(Catalog).where(Catalog.id == catalog_id))
+
+def import_catalog(json_path: str, db: Session, verbose: bool = False, enrich: bool = False,
+                   load_data: bool = False, use_cache: bool = True, force: bool = False):
+    """
+    Import a JSON catalog into the database.
+    
+    A catalog already imported under the same name and source folder is
+    skipped, unless force is set, in which case it is replaced.
+    """
+    print(f"Reading catalog from {json_path}...")
+    
+    try:
+        metadata, chapters_data, recipes_data = read_catalog_stream(json_path)
     except Exception as e:
         print(f"Error reading file: {e}")
         return
 
     # Create Catalog entry
     # Infer name from filename if not in metadata
-    catalog_name = Path(json_path).stem.replace('_', ' ').title()
-    metadata = data.get("metadata", {})
+    catalog_name = catalog_name_for(json_path)
     
-    # Check if catalog already exists (by name and source folder combo roughly)
-    # For now simplicity: just create new one or update if name matches exactly?
-    # Let's create new for safety, user can delete old ones.
+    # Check if catalog already exists (by name and source folder combo)
+    existing_id = find_existing_catalog(db, catalog_name, metadata.get("source_folder"))
+    if existing_id is not None:
+        if not force:
+            print(f"⏭️  Catalog '{catalog_name}' is already imported (ID: {existing_id}), skipping. Use --force to re-import.")
+            return
+        # Removed in the same transaction that creates the replacement below
+        print(f"♻️  Replacing existing catalog '{catalog_name}' (ID: {existing_id})")
+        remove_catalog(db, existing_id)
     
     catalog = Catalog(
         name=catalog_name,
         source_folder=metadata.get("source_folder"),
         model_used=metadata.get("model_used"),
         metadata_info=metadata,
-        recipe_count=len(data.get("recipes", []))
+        recipe_count=0  # set once the recipes have been streamed
     )
     
+    # flush() assigns the id without a commit + refresh round-trip; the
+    # catalog row is committed together with its chapters below
     db.add(catalog)
-    db.commit()
-    db.refresh(catalog)
-    print(f"✅ Created Catalog: {catalog.name} (ID: {catalog.id})")
+    db.flush()
+    catalog_id = catalog.id
+    print(f"✅ Created Catalog: {catalog.name} (ID: {catalog_id})")
 
     # Import Chapters
-    chapters_data = data.get("chapters", [])
-    for chap_data in chapters_data:
-        chapter = Chapter(
-            catalog_id=catalog.id,
-            chapter_number=str(chap_data.get("chapter_number", "")),
-            chapter_title=chap_data.get("chapter_title"),
-            recipe_list=chap_data.get("recipe_list", [])
-        )
-        db.add(chapter)
+    # No ids are needed back, so this is a single executemany (one multi-row
+    # INSERT with pymysql) however many chapters the catalog has
+    db.bulk_insert_mappings(Chapter, [prepare_chapter_row(chap_data, catalog_id) for chap_data in chapters_data])
+    db.commit()
     
     print(f"✅ Imported {len(chapters_data)} chapters")
 
     # Import Recipes
-    recipes_data = data.get("recipes", [])
+    # Recipes are collected and written with one bulk INSERT per table per chunk
+    # instead of an add + flush round-trip for every recipe and ingredient
+    recipes_seen = 0
     recipe_count = 0
+    pending = []
     
-    for r_data in recipes_data:
-        # Clean up some fields
-        try:
-            # Handle list fields for JSON columns
-            instructions = r_data.get("instructions", [])
-            
-            # Validation: Skip recipes with missing instructions
-            if not instructions:
-                if verbose:
-                    print(f"  ⚠️  Skipping: '{r_data.get('name')}' (missing instructions)")
-                continue
-
-            # Title Case Helper
-            def to_title_case(s):
-                if not s:
-                    return s
-                import string
-                return string.capwords(s)
-
-            recipe_name = r_data.get("name") or "Unknown Recipe"
-            recipe_name = to_title_case(recipe_name)
-            
-            ingredients = r_data.get("ingredients", [])
-            
-            # Use r_data references for internal logic, but recipe_name for display/AI prompt
-        
-            # --- AI ENRICHMENT START ---
-            if enrich:
-                # Check for missing critical fields
-                missing_fields = []
-                if not r_data.get("calories") or r_data.get("calories") == "": missing_fields.append("calories")
-                if not r_data.get("prep_time") or r_data.get("prep_time") == "": missing_fields.append("prep_time")
-                if not r_data.get("cook_time") or r_data.get("cook_time") == "": missing_fields.append("cook_time")
-                if not r_data.get("meal_type") or r_data.get("meal_type") == "any": missing_fields.append("meal_type")
-
-                if missing_fields:
-                    if verbose:
-                        print(f"  🧠 Enriching '{recipe_name}' (Missing: {', '.join(missing_fields)})...")
-                    
-                    # Construct Prompt
-                    prompt = f"""
-                    Analyze this recipe and provide the missing metadata in JSON format.
-                    Recipe: {recipe_name}
-                    Ingredients: {'; '.join(ingredients)}
-                    Instructions: {'; '.join(instructions[:5])}...
-
-                    Return a JSON object with these keys (estimate if needed):
-                    {{
-                        "calories": "e.g. 500 kcal per serving",
-                        "protein": "e.g. 30g per serving",
-                        "carbs": "e.g. 40g per serving", 
-                        "fat": "e.g. 20g per serving",
-                        "prep_time": "e.g. 15 mins",
-                        "cook_time": "e.g. 30 mins",
-                        "total_time": "e.g. 45 mins",
-                        "serves": "e.g. 4",
-                        "meal_type": "One of: breakfast, lunch, dinner, snack, dessert",
-                        "meal_type": "One of: breakfast, lunch, dinner, snack, dessert",
-                        "dish_role": "One of: main, side, sub_recipe",
-                        "sub_recipes": ["List of recipe names mentioned in ingredients, e.g. 'Basic Pie Crust', 'Tartar Sauce'. Empty if none."]
-                    }}
-                    Output ONLY JSON.
-                    """
-                    
-                    # Call AI
-                    ai_response = query_llm(prompt, json_mode=True)
-                    enriched_data = parse_json_response(ai_response)
-                    
-                    if enriched_data:
-                        # --- SANITIZATION HELPERS ---
-                        def clean_meal_type(mt):
-                            if not mt: return "any"
-                            mt = mt.lower().strip()
-                            valid_types = {'breakfast', 'lunch', 'dinner', 'dessert', 'snack', 'main', 'side', 'any'}
-                            if mt in valid_types:
-                                return mt
-                            # Mappings
-                            if "condiment" in mt or "sauce" in mt: return "side"
-                            if "appetizer" in mt: return "snack"
-                            if "soup" in mt or "salad" in mt: return "lunch" # Arbitrary but safer
-                            return "any"
-
-                        def clean_short_string(s, max_len=20):
-                            if not s: return ""
-                            s = str(s).strip()
-                            if s.lower() in ["not provided", "n/a", "unavailable", "unknown"]:
-                                return ""
-                            # If too long, try to extract digits + unit
-                            if len(s) > max_len:
-                                import re
-                                # Extract "123 kcal" or "10 mins"
-                                match = re.search(r'(\d+(?:-\d+)?\s*\w+)', s)
-                                if match:
-                                    return match.group(1)[:max_len]
-                                return s[:max_len]
-                            return s
-
-                        # Update fields if they were missing
-                        if not r_data.get("calories"): r_data["calories"] = clean_short_string(enriched_data.get("calories", ""))
-                        if not r_data.get("protein"): r_data["protein"] = clean_short_string(enriched_data.get("protein", ""))
-                        if not r_data.get("carbs"): r_data["carbs"] = clean_short_string(enriched_data.get("carbs", ""))
-                        if not r_data.get("fat"): r_data["fat"] = clean_short_string(enriched_data.get("fat", ""))
-                        
-                        # Times can be a bit longer (50 chars), but clean anyway
-                        if not r_data.get("prep_time"): r_data["prep_time"] = clean_short_string(enriched_data.get("prep_time", ""), 45)
-                        if not r_data.get("cook_time"): r_data["cook_time"] = clean_short_string(enriched_data.get("cook_time", ""), 45)
-                        if not r_data.get("total_time"): r_data["total_time"] = clean_short_string(enriched_data.get("total_time", ""), 45)
-                        
-                        if not r_data.get("meal_type") or r_data.get("meal_type") == "any": 
-                            r_data["meal_type"] = clean_meal_type(enriched_data.get("meal_type", "dinner"))
-                        
-                        if not r_data.get("dish_role"): 
-                            role = enriched_data.get("dish_role", "main").lower()
-                            r_data["dish_role"] = role if role in ['main', 'side', 'sub_recipe'] else 'main'
-                            
-                        # Enrich sub_recipes if missing
-                        if not r_data.get("sub_recipes") and enriched_data.get("sub_recipes"):
-                            r_data["sub_recipes"] = enriched_data.get("sub_recipes", [])
-                            
-                        if not r_data.get("serves"): r_data["serves"] = clean_short_string(str(enriched_data.get("serves", "1")), 45)
-                        
-                        if verbose: print(f"    ✨ Enriched: {r_data.get('meal_type')} | {r_data.get('calories')}")
-                    else:
-                        print(f"    ⚠️ Failed to enrich '{recipe_name}'")
-            # --- AI ENRICHMENT END ---
-
-            tips = r_data.get("tips", [])
-            sub = r_data.get("sub_recipes", [])
-            diet = r_data.get("dietary_info", [])
-            imgs = r_data.get("source_images", []) # or "source_image" handling
-            
-            # Normalize source_images
-            if "source_image" in r_data and not imgs:
-                imgs = [r_data["source_image"]]
-
-            # recipe_name variable is already defined above
-
-            recipe = Recipe(
-                catalog_id=catalog.id,
-                name=recipe_name,
-                chapter=r_data.get("chapter"),
-                chapter_number=str(r_data.get("chapter_number", "")),
-                page_number=str(r_data.get("page_number", "")),  # might not exist in JSON yet
-                meal_type=r_data.get("meal_type") or "any",
-                dish_role=r_data.get("dish_role", "main"),
-                serves=str(r_data.get("serves", "")),
-                prep_time=str(r_data.get("prep_time", "")),
-                cook_time=str(r_data.get("cook_time", "")),
-                total_time=str(r_data.get("total_time", "")),
-                calories=str(r_data.get("calories", "")),
-                protein=str(r_data.get("protein", "")),
-                carbs=str(r_data.get("carbs", "")),
-                fat=str(r_data.get("fat", "")),
-                nutrition_full=r_data.get("nutrition_full"),
-                description=r_data.get("description"),
-                instructions=instructions,
-                tips=tips,
-                sub_recipes=sub,
-                dietary_info=diet,
-                is_complete=r_data.get("is_complete", True),
-                source_images=imgs
-            )
-            
-            db.add(recipe)
-            db.flush() # Get recipe.id
-            
-            # Import Ingredients
-            # ingredients already extracted above
-            for idx, ing_text in enumerate(ingredients):
-                ing = Ingredient(
-                    recipe_id=recipe.id,
-                    ingredient_text=ing_text,
-                    sort_order=idx
-                )
-                db.add(ing)
-                
-            recipe_count += 1
+    for r_data in read_ahead(recipes_data):
+        recipes_seen += 1
+        # Validation: Skip recipes with missing instructions
+        if not r_data.get("instructions", []):
             if verbose:
-                print(f"  Imported: {recipe.name}")
-                
-        except Exception as e:
-            print(f"❌ Error importing recipe {r_data.get('name')}: {e}")
-            db.rollback()
+                print(f"  ⚠️  Skipping: '{r_data.get('name')}' (missing instructions)")
             continue
 
+        pending.append(r_data)
+        if len(pending) >= IMPORT_CHUNK_SIZE:
+            recipe_count += import_recipe_chunk(db, catalog_id, pending, verbose, enrich, load_data, use_cache)
+            pending = []
+
+    recipe_count += import_recipe_chunk(db, catalog_id, pending, verbose, enrich, load_data, use_cache)
+
+    db.execute(update(Catalog).where(Catalog.id == catalog_id).values(recipe_count=recipes_seen))
     db.commit()
     print(f"✅ Successfully imported {recipe_count} recipes and their ingredients.")
 
 
+def make_session_factory(args):
+    """Build the (engine, sessionmaker) pair main() and the import workers connect with."""
+    if args.db_user and args.db_pass:
+        db_url = f"mysql+pymysql://{args.db_user}:{args.db_pass}@{args.db_host}:{args.db_port}/{args.db_name}"
+        engine = create_engine(db_url, pool_pre_ping=True, pool_recycle=3600, insertmanyvalues_page_size=1000,
+                               json_serializer=json_dumps,
+                               connect_args={"local_infile": True} if args.load_data else {})
+    elif args.load_data or ORJSON_AVAILABLE:
+        # Same database as the API, but with LOCAL INFILE allowed on the connection
+        # and/or the faster JSON encoder
+        engine = create_engine(default_engine.url, pool_pre_ping=True, pool_recycle=3600,
+                               json_serializer=json_dumps,
+                               connect_args={"local_infile": True} if args.load_data else {})
+    else:
+        return default_engine, DefaultSessionLocal
+    return engine, sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+def import_file(json_path: str, args, Session=None):
+    """Import one catalog file on a fresh session (also the --parallel worker entry point)."""
+    if Session is None:
+        _, Session = make_session_factory(args)
+    db = Session()
+    try:
+        import_catalog(json_path, db, verbose=args.verbose, enrich=args.enrich, load_data=args.load_data,
+                       use_cache=not args.no_cache, force=args.force)
+    finally:
+        db.close()
+
 def main():
     parser = argparse.ArgumentParser(description="Import JSON recipe catalog into MariaDB")
-    parser.add_argument("catalog_path", help="Path to the JSON catalog file")
+    parser.add_argument("catalog_paths", nargs="+", metavar="catalog_path", help="Path(s) to JSON catalog files")
     parser.add_argument("--verbose", "-v", action="store_true", help="Print details during import")
     parser.add_argument("--enrich", action="store_true", help="Use AI to fill missing metadata (calories, times, etc)")
     parser.add_argument("--init-db", action="store_true", help="Initialize database tables before importing")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached --enrich answers and ask the LLM again")
+    parser.add_argument("--load-data", action="store_true",
+                        help="Send recipes and ingredients with LOAD DATA LOCAL INFILE (MySQL/MariaDB, server needs local_infile=1)")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-import catalogs that were already imported (replaces the existing one)")
+    parser.add_argument("--parallel", type=int, default=1, metavar="N",
+                        help="Import up to N catalog files at once, each in its own process")
     
     parser.add_argument("--db-user", "-u", help="Database username")
     parser.add_argument("--db-pass", "-p", help="Database password")
@@ -284,19 +835,16 @@ def main():
     
     args = parser.parse_args()
     
-    if not os.path.exists(args.catalog_path):
-        print(f"Error: File not found: {args.catalog_path}")
+    missing = [path for path in args.catalog_paths if not os.path.exists(path)]
+    if missing:
+        for path in missing:
+            print(f"Error: File not found: {path}")
         return
 
     # Determine DB connection
     if args.db_user and args.db_pass:
         print(f"Connecting to database as {args.db_user}...")
-        db_url = f"mysql+pymysql://{args.db_user}:{args.db_pass}@{args.db_host}:{args.db_port}/{args.db_name}"
-        active_engine = create_engine(db_url, pool_pre_ping=True)
-        ActiveSession = sessionmaker(autocommit=False, autoflush=False, bind=active_engine)
-    else:
-        active_engine = default_engine
-        ActiveSession = DefaultSessionLocal
+    active_engine, ActiveSession = make_session_factory(args)
 
     # Check for Tables
     if args.init_db:
@@ -304,12 +852,16 @@ def main():
         Base.metadata.create_all(bind=active_engine)
         print("Tables created.")
 
-    # Create session
-    db = ActiveSession()
-    try:
-        import_catalog(args.catalog_path, db, verbose=args.verbose, enrich=args.enrich)
-    finally:
-        db.close()
+    if args.parallel > 1 and len(args.catalog_paths) > 1:
+        # Catalogs are independent, so each file gets its own process and
+        # connection. Pooled connections must not be inherited across fork.
+        active_engine.dispose()
+        with ProcessPoolExecutor(max_workers=args.parallel) as executor:
+            list(executor.map(import_file, args.catalog_paths, repeat(args)))
+        return
+
+    for path in args.catalog_paths:
+        import_file(path, args, ActiveSession)
 
 if __name__ == "__main__":
     main()
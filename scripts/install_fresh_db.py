@@ -1,70 +1,78 @@
 
-import os
 import sys
 from pathlib import Path
 
+import pymysql
+from pymysql.constants import CLIENT
+
 # Add parent to path to find other modules if needed
 sys.path.append(str(Path(__file__).parent))
 
 import db_tools
 
-def get_mysql_command_base(config):
-    """Build base mysql command list (without dbname) based on config"""
-    cmd = ["mysql"]
-    
+def connect(config, database=None):
+    """Open a pymysql connection that accepts several ;-separated statements per execute"""
+    kwargs = {
+        'user': config['user'],
+        'password': config['password'] or "",
+        'database': database,
+        'charset': "utf8mb4",
+        'autocommit': True,
+        'client_flag': CLIENT.MULTI_STATEMENTS,
+    }
     if config['socket']:
-        cmd.extend(["--socket", config['socket']])
+        kwargs['unix_socket'] = config['socket']
     else:
-        cmd.extend(["-h", config['host']])
-        cmd.extend(["-P", str(config['port'])])
-        
-    cmd.extend(["-u", config['user']])
-    
-    return cmd
+        kwargs['host'] = config['host']
+        kwargs['port'] = int(config['port'])
+    return pymysql.connect(**kwargs)
+
+def run_script(conn, sql):
+    """Execute a multi-statement SQL script, raising on the first failing statement"""
+    with conn.cursor() as cursor:
+        cursor.execute(sql)
+        # Each statement has its own result; errors surface while stepping through them
+        while cursor.nextset():
+            pass
 
 def install_fresh_db():
     config = db_tools.load_config()
     db_name = config['dbname']
-    
+
     print(f"⚠️  WARNING: This will DESTROY the database '{db_name}'.")
     print("Are you sure? (Type 'yes' to confirm)")
-    
+
     # Simple safety check
     confirm = input("> ")
     if confirm.lower() != 'yes':
         print("Aborted.")
         sys.exit(0)
-        
-    env = os.environ.copy()
-    if config['password']:
-        env['MYSQL_PWD'] = config['password']
-        
-    # 1. Drop and Recreate Database
-    # We connect without a database selected initially or use -e to run command
-    print(f"Resetting database '{db_name}'...")
-    
-    drop_create_sql = f"DROP DATABASE IF EXISTS {db_name}; CREATE DATABASE {db_name} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;"
-    
-    cmd_base = get_mysql_command_base(config)
-    
-    # Run Drop/Create
-    create_cmd = cmd_base + ["-e", f"'{drop_create_sql}'"]
-    db_tools.run_command(" ".join(create_cmd), env)
-    
-    # 2. Import Schema
+
+    # Check for the schema before anything is dropped
     schema_path = Path(__file__).parent.parent / "database" / "schema.sql"
     if not schema_path.exists():
         print(f"Error: Schema file not found at {schema_path}")
         sys.exit(1)
-        
-    print(f"Importing schema from {schema_path}...")
-    
-    # Build proper command: mysql ... dbname < schema.sql
-    import_cmd_parts = cmd_base + [db_name]
-    import_cmd_str = " ".join(import_cmd_parts) + f" < '{schema_path}'"
-    
-    db_tools.run_command(import_cmd_str, env)
-    
+
+    try:
+        # 1. Drop and Recreate Database
+        # We connect without a database selected initially
+        print(f"Resetting database '{db_name}'...")
+        conn = connect(config)
+        try:
+            run_script(conn, f"DROP DATABASE IF EXISTS `{db_name}`; "
+                             f"CREATE DATABASE `{db_name}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;")
+            conn.select_db(db_name)
+
+            # 2. Import Schema
+            print(f"Importing schema from {schema_path}...")
+            run_script(conn, schema_path.read_text(encoding="utf-8"))
+        finally:
+            conn.close()
+    except pymysql.MySQLError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
     print("\n✅ Database installation complete!")
 
 if __name__ == "__main__":
@@ -1,31 +1,33 @@
-import os
-from sqlalchemy import create_engine, text, inspect
+from collections import defaultdict
+from sqlalchemy import text
 from dotenv import load_dotenv
 
 # Force reload for local env
 load_dotenv(override=True)
 
-# DB Config
-DB_USER = os.getenv("DB_USERNAME", "meal_user")
-DB_PASS = os.getenv("DB_PASSWORD", "1luvMySQL!")
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "8889")
-DB_NAME = os.getenv("DB_DATABASE", "meal_planner")
-
-DATABASE_URL = os.getenv("DATABASE_URL")
-if not DATABASE_URL:
-    DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+from _db import get_engine, CONFIG
 
 def verify_schema():
-    print(f"Connecting to Database: {DB_NAME} on {DB_HOST}:{DB_PORT}...")
+    print(f"Connecting to Database: {CONFIG.name} on {CONFIG.host}:{CONFIG.port}...")
     try:
-        engine = create_engine(DATABASE_URL)
-        inspector = inspect(engine)
-        
-        # 1. Check Table Existence
-        tables = inspector.get_table_names()
+        engine = get_engine()
         required_tables = ['meal_plans', 'recipes', 'ingredients', 'users']
-        missing_tables = [t for t in required_tables if t not in tables]
+
+        # Tables and their columns in one round trip, instead of one inspector
+        # query (or several SHOW statements) per table
+        columns_sql = text("""
+            SELECT table_name, column_name
+            FROM information_schema.columns
+            WHERE table_schema = DATABASE()
+            AND table_name IN ('meal_plans', 'recipes', 'ingredients', 'users');
+        """)
+        cols = defaultdict(set)
+        with engine.connect() as conn:
+            for table_name, column_name in conn.execute(columns_sql):
+                cols[table_name].add(column_name)
+
+        # 1. Check Table Existence
+        missing_tables = [t for t in required_tables if t not in cols]
         
         if missing_tables:
             print(f"❌ CRITICAL FAILURE: Missing tables: {missing_tables}")
@@ -35,8 +37,7 @@ def verify_schema():
             
         # 2. Check Specific Columns
         # Check meal_plans for excluded_ingredients
-        columns = [c['name'] for c in inspector.get_columns('meal_plans')]
-        if 'excluded_ingredients' in columns:
+        if 'excluded_ingredients' in cols['meal_plans']:
             print(f"✅ SUCCESS: 'excluded_ingredients' column found in 'meal_plans'.")
         else:
             print(f"❌ FAILURE: 'excluded_ingredients' column MISSING in 'meal_plans'.")
@@ -48,12 +48,15 @@ class CatalogController
 
                 // Check for enrich flag
                 $enrich = !empty($request->getParsedBody()['enrich']) ? 'true' : 'false';
+                // Replace a catalog already imported from the same file (default: skip it)
+                $force = !empty($request->getParsedBody()['force']) ? 'true' : 'false';
 
                 // Send to API
                 $result = $this->api->postMultipart('/api/catalogs/import', [
                     'file' => $tempPath
                 ], [
-                    'enrich' => $enrich
+                    'enrich' => $enrich,
+                    'force' => $force
                 ]);
 
                 // Cleanup temp file
@@ -61,7 +64,9 @@ class CatalogController
                     unlink($tempPath);
                 }
 
-                if (isset($result['message'])) {
+                if (($result['status'] ?? '') === 'skipped') {
+                    $this->session->flash('error', $filename . ': ' . $result['message']);
+                } elseif (isset($result['message'])) {
                     $this->session->flash('success', 'Import started for ' . $filename);
                 } else {
                     $error = $result['error'] ?? 'Unknown error';
@@ -24,6 +24,12 @@
                     Enrich with AI (Calories, Meal Type, Prep Time)
                 </label>
             </div>
+            <div class="form-check">
+                <input class="form-check-input" type="checkbox" name="force" id="forceCheck" value="1">
+                <label class="form-check-label" for="forceCheck">
+                    Replace if this catalog was already imported
+                </label>
+            </div>
             <div class="form-text">Upload a .json file generated by the cataloger script.</div>
         </form>
     </div>